@@ -1,15 +1,44 @@
 import os
 import sys
+import atexit
 import time
 import re
-import subprocess
-import platform
-import requests
-import webbrowser
+import hashlib
 import json
 import random
+import threading
+from bisect import bisect_left
+from collections import OrderedDict, deque
 from datetime import datetime
-from typing import Dict, List, Optional, TYPE_CHECKING
+from functools import lru_cache
+from itertools import accumulate
+from types import MappingProxyType
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
+
+# orjson is optional; it only speeds up local profile persistence
+try:
+    import orjson
+
+    def _json_dumps(obj) -> bytes:
+        return orjson.dumps(obj)
+
+    _json_loads = orjson.loads
+except ImportError:
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode("utf-8")
+
+    _json_loads = json.loads
+
+# Verbose diagnostics are opt-in via LUNA_DEBUG=1 (checked once at import)
+_DEBUG = os.getenv("LUNA_DEBUG", "0") == "1"
+
+def _mask(tok: Optional[str]) -> str:
+    """Mask a token for logging; only slices it when debugging is enabled."""
+    if not tok:
+        return "missing"
+    if not _DEBUG or len(tok) <= 8:
+        return "present"
+    return tok[:4] + "..." + tok[-4:]
 
 # Custom exception to carry HTTP status codes from HF calls
 class HFRequestError(Exception):
@@ -17,12 +46,47 @@ class HFRequestError(Exception):
         super().__init__(message)
         self.status_code = status_code
         self.message = message
-from ddgs import DDGS
+
+# Typed failures raised by OpenRouterAPI.query_model so callers can decide on retries
+# without inspecting error text
+class AuthError(HFRequestError):
+    """401/403: bad or missing API key; never worth retrying as-is"""
+
+class RateLimitError(HFRequestError):
+    """429: retry after backing off"""
+
+class TransientError(HFRequestError):
+    """Endpoint loading, 503/524 or timeout: retry after backing off"""
+
+class PausedError(HFRequestError):
+    """Endpoint reported itself paused"""
+
+# Network/OS helpers (requests, ddgs, subprocess, webbrowser) are imported
+# inside the functions that use them so the local-only path starts without them.
 
 # Import SettingsManager only for type checking to avoid circular imports
 if TYPE_CHECKING:
     from app import SettingsManager
 
+# Parsed .env contents keyed by file signature (path, mtime_ns, size)
+_ENV_CACHE = {"sig": None, "data": {}}
+
+def _parse_dotenv(env_path: str) -> Dict[str, str]:
+    data = {}
+    with open(env_path, "r", encoding="utf-8") as f:
+        for raw in f:
+            line = raw.strip()
+            if not line or line.startswith("#"):
+                continue
+            key, sep, val = line.partition("=")
+            if not sep:
+                continue
+            key = key.strip()
+            val = val.strip().strip("\"'")
+            if key and val:
+                data[key] = val
+    return data
+
 # Lightweight .env loader (no external dependency). Loads key=value pairs into os.environ
 def _load_env_from_dotenv():
     try:
@@ -33,20 +97,18 @@ def _load_env_from_dotenv():
         else:
             root_dir = os.path.dirname(os.path.abspath(__file__))
         env_path = os.path.join(root_dir, ".env")
-        if not os.path.exists(env_path):
+        try:
+            st = os.stat(env_path)
+        except FileNotFoundError:
             return
-        with open(env_path, "r", encoding="utf-8") as f:
-            for raw in f:
-                line = raw.strip()
-                if not line or line.startswith("#"):
-                    continue
-                if "=" not in line:
-                    continue
-                key, val = line.split("=", 1)
-                key = key.strip()
-                val = val.strip().strip('"').strip("'")
-                if key and val and key not in os.environ:
-                    os.environ[key] = val
+        # Only reparse when the file has changed since the last load
+        sig = (env_path, st.st_mtime_ns, st.st_size)
+        if _ENV_CACHE["sig"] != sig:
+            _ENV_CACHE["data"] = _parse_dotenv(env_path)
+            _ENV_CACHE["sig"] = sig
+        for key, val in _ENV_CACHE["data"].items():
+            if key not in os.environ:
+                os.environ[key] = val
         print("[OK] Loaded environment variables from .env")
     except Exception as e:
         print(f"[WARN] Failed to load .env: {e}")
@@ -64,16 +126,285 @@ def _get_local_engine_profile_path() -> str:
     base = _get_user_data_dir()
     return os.path.join(base, "local_engine_profile.json")
 
+# Minimum seconds between local profile writes; pending changes are flushed at exit
+_PROFILE_FLUSH_INTERVAL = 5.0
+
+def _write_local_profile(data: Dict[str, object]) -> bool:
+    """Atomically write the local engine profile; True on success"""
+    path = _get_local_engine_profile_path()
+    tmp_path = path + ".tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(_json_dumps(data))
+        os.replace(tmp_path, path)
+        return True
+    except Exception:
+        return False
+
+# Last formatted memory timestamp as [epoch_second, iso_string]
+_LAST_TS = [0, ""]
+
+def _memory_timestamp() -> str:
+    """ISO timestamp at one-second resolution, reused for turns in the same second"""
+    now = int(time.time())
+    if now != _LAST_TS[0]:
+        _LAST_TS[:] = [now, datetime.fromtimestamp(now).isoformat()]
+    return _LAST_TS[1]
+
+# Conversational response patterns keyed by intent, then creativity tier
+_RAW_RESPONSE_PATTERNS: Dict[str, Dict[str, List[str]]] = {
+    "greetings": {
+        "conservative": [
+            "Hello! How can I assist you today?",
+            "Hi there! What can I help you with?",
+            "Good day! How may I help you?"
+        ],
+        "balanced": [
+            "Hello! How can I assist you today?",
+            "Hi there! What can I help you with?",
+            "Good to see you! What's on your mind?",
+            "Hey! Ready to help with whatever you need.",
+            "Greetings! How may I be of service?"
+        ],
+        "creative": [
+            "Hello there, wonderful human! What adventure shall we embark on today?",
+            "Greetings, my friend! What fascinating topic can we explore together?",
+            "Hey there! I'm buzzing with excitement to help you with anything!",
+            "Well hello! What delightful challenge can I tackle for you today?",
+            "Salutations! Ready to dive into whatever's on your brilliant mind!"
+        ]
+    },
+    "how_are_you": {
+        "conservative": [
+            "I'm functioning well, thank you. How are you?",
+            "All systems operational. How can I help?",
+            "I'm doing fine. What can I do for you?"
+        ],
+        "balanced": [
+            "I'm doing great, thank you for asking! How are you?",
+            "All systems running smoothly! How's your day going?",
+            "Fantastic, thanks! What can I help you accomplish today?",
+            "I'm here and ready to help! What's new with you?"
+        ],
+        "creative": [
+            "I'm absolutely fantastic! My circuits are practically humming with joy! How's your day treating you?",
+            "Couldn't be better! I'm like a digital ray of sunshine today! What's got you curious?",
+            "I'm thriving in the digital realm! Every conversation energizes me. How are you doing, my friend?",
+            "Spectacular! I'm feeling particularly clever today. What puzzle can we solve together?"
+        ]
+    },
+    "thanks": {
+        "conservative": [
+            "You're welcome. Anything else I can help with?",
+            "Glad to help. Is there anything else?",
+            "No problem. What else can I do?"
+        ],
+        "balanced": [
+            "You're very welcome! Anything else I can help with?",
+            "Happy to help! Is there anything else you need?",
+            "My pleasure! Let me know if you need anything else.",
+            "Glad I could assist! What else can I do for you?"
+        ],
+        "creative": [
+            "Absolutely my pleasure! Helping you brightens my entire digital day!",
+            "You're so welcome! It's like digital dopamine when I can be useful!",
+            "Aww, you're too kind! I live for moments like these. What's next on our agenda?",
+            "The pleasure was all mine! I'm practically glowing with satisfaction right now!"
+        ]
+    },
+    "capabilities": {
+        "conservative": [
+            "I can help with weather, web searches, system commands, and conversation.",
+            "My functions include weather information, internet searches, and system operations.",
+            "I provide weather data, search results, system commands, and general assistance."
+        ],
+        "balanced": [
+            "I can help with weather, web searches, system commands, and general conversation!",
+            "I'm great at finding information, controlling your system, checking weather, and chatting!",
+            "Weather updates, web searches, opening programs, and friendly conversation are my specialties!"
+        ],
+        "creative": [
+            "Oh, I'm like a digital Swiss Army knife! Weather wizardry, web search sorcery, system command mastery, and conversation that'll knock your socks off!",
+            "I'm your personal digital genie! I grant wishes for weather info, conjure search results from the internet, command your system like magic, and chat with the enthusiasm of a thousand coffee shots!",
+            "Think of me as your AI sidekick! I can forecast weather like a meteorologist, search the web faster than you can blink, control your computer like a digital puppeteer, and chat with more personality than a talk show host!"
+        ]
+    },
+    "confused": {
+        "conservative": [
+            "I don't understand. Please clarify.",
+            "Could you rephrase that?",
+            "Please provide more information."
+        ],
+        "balanced": [
+            "I'm not quite sure I understand. Could you rephrase that?",
+            "Could you clarify what you're looking for?",
+            "I want to help, but I need a bit more information."
+        ],
+        "creative": [
+            "Hmm, you've got me scratching my digital head! Could you paint that picture a bit clearer for me?",
+            "Oops, my understanding circuits are a bit tangled! Mind rewording that masterpiece?",
+            "I'm drawing a delightful blank here! Help me connect the dots with a little more detail?"
+        ]
+    },
+    "default_responses": {
+        "conservative": [
+            "I see. What would you like to know about that?",
+            "That's interesting. How can I help?",
+            "Please tell me more about what you need."
+        ],
+        "balanced": [
+            "That's interesting! Tell me more about that.",
+            "I see! What would you like to know about it?",
+            "Fascinating! How can I help you with that?",
+            "That sounds intriguing! What specifically interests you about it?"
+        ],
+        "creative": [
+            "Ooh, that's got my curiosity circuits firing on all cylinders! Spill the details!",
+            "Now THAT sounds like an adventure waiting to happen! What's the scoop?",
+            "My interest is officially piqued! Let's dive deep into this rabbit hole together!",
+            "You've struck digital gold with that topic! I'm all ears (well, all sensors)!"
+        ]
+    }
+}
+
+# Freeze the patterns: interned keys/strings in immutable tuples shared by all engines
+_RESPONSE_PATTERNS: Dict[str, Dict[str, Tuple[str, ...]]] = {
+    sys.intern(intent): {
+        sys.intern(tier): tuple(sys.intern(s) for s in responses)
+        for tier, responses in tiers.items()
+    }
+    for intent, tiers in _RAW_RESPONSE_PATTERNS.items()
+}
+
+# Flat (intent, tier) -> responses table so selection is a single lookup
+_FLAT_RESPONSES: Dict[Tuple[str, str], Tuple[str, ...]] = {
+    (intent, tier): responses
+    for intent, tiers in _RESPONSE_PATTERNS.items()
+    for tier, responses in tiers.items()
+}
+
+# Intent keyword patterns in priority order; one compiled scan per intent
+_INTENT_PATTERNS = (
+    (re.compile(r"\b(?:hello|hi|hey|good morning|good afternoon|greetings)\b", re.I), sys.intern("greetings")),
+    (re.compile(r"\b(?:how are you|how's it going|how do you feel)\b", re.I), sys.intern("how_are_you")),
+    (re.compile(r"\b(?:thanks|thank you|appreciate|grateful)\b", re.I), sys.intern("thanks")),
+    (re.compile(r"\b(?:good job|excellent|amazing|awesome|brilliant)\b", re.I), sys.intern("compliments")),
+    (re.compile(r"\b(?:what can you do|your abilities|your capabilities|help me)\b", re.I), sys.intern("capabilities")),
+    (re.compile(r"\b(?:bye|goodbye|see you|farewell|exit)\b", re.I), sys.intern("farewells")),
+)
+
+# Selection weight profiles per creativity tier: (leading weights, weight for the rest)
+_WEIGHT_PROFILES = {
+    "low_med": ((3, 2, 1), 1),
+    "medium": ((2, 2, 2, 1, 1), 1),
+    "high_med": ((1, 1, 2, 2, 3), 2),
+}
+
+def _build_cum_weights(tier_code: str, n: int) -> Tuple[int, ...]:
+    head, rest = _WEIGHT_PROFILES[tier_code]
+    weights = (list(head) + [rest] * (n - len(head)))[:n]
+    return tuple(accumulate(weights))
+
+# Cumulative weights for every (tier, list length) pair known at import
+_CUM_WEIGHTS: Dict[Tuple[str, int], Tuple[int, ...]] = {
+    (tier_code, n): _build_cum_weights(tier_code, n)
+    for tier_code in _WEIGHT_PROFILES
+    for n in {len(responses) for responses in _FLAT_RESPONSES.values()}
+}
+
+def _cum_weights_for(tier_code: str, n: int) -> Tuple[int, ...]:
+    cum = _CUM_WEIGHTS.get((tier_code, n))
+    if cum is None:
+        cum = _CUM_WEIGHTS[(tier_code, n)] = _build_cum_weights(tier_code, n)
+    return cum
+
+# Creativity level -> response set tier (upper bounds are inclusive)
+_RESPONSE_TIER_THRESHOLDS = (0.3, 0.7)
+_RESPONSE_TIERS = ("conservative", "balanced", "creative")
+
+def _select_conservative(rng, responses):
+    # Always use first response for consistency
+    return responses[0]
+
+def _select_low_med(rng, responses):
+    # Slight variation, prefer earlier responses
+    return rng.choices(responses, cum_weights=_cum_weights_for("low_med", len(responses)))[0]
+
+def _select_medium(rng, responses):
+    # Balanced selection with some preference for variety
+    return rng.choices(responses, cum_weights=_cum_weights_for("medium", len(responses)))[0]
+
+def _select_high_med(rng, responses):
+    # More random, slight preference for later responses
+    return rng.choices(responses, cum_weights=_cum_weights_for("high_med", len(responses)))[0]
+
+def _select_max(rng, responses):
+    # Completely random with potential for response mixing
+    if len(responses) > 1 and rng.random() < 0.1:  # 10% chance to mix responses
+        selected = rng.sample(responses, min(2, len(responses)))
+        return f"{selected[0]} {selected[1].lower()}"
+    return rng.choice(responses)
+
+# Creativity level -> selection strategy (upper bounds are inclusive)
+_TIER_THRESHOLDS = (0.3, 0.5, 0.7, 0.8)
+_TIER_HANDLERS = (_select_conservative, _select_low_med, _select_medium, _select_high_med, _select_max)
+
+_INTENT_CONFUSED = sys.intern("confused")
+_INTENT_DEFAULT = sys.intern("default")
+
+@lru_cache(maxsize=1024)
+def _classify_intent(message_lower: str) -> str:
+    """Map an already-lowercased message to an intent name (pure, memoized)"""
+    # Basic intent patterns, checked in priority order
+    for pattern, intent in _INTENT_PATTERNS:
+        if pattern.search(message_lower):
+            return intent
+    if len(message_lower) < 15 and "?" in message_lower:
+        return _INTENT_CONFUSED
+    return _INTENT_DEFAULT
+
+# Longest normalized message served from _canned_response; longer ones take the normal path
+_CANNED_MAX_LEN = 8
+
+@lru_cache(maxsize=256)
+def _canned_response(message_lower: str) -> str:
+    """Deterministic conservative-tier reply (the first response for the intent)"""
+    intent = _classify_intent(message_lower)
+    responses = _FLAT_RESPONSES.get((intent, "conservative")) or _FLAT_RESPONSES[("default_responses", "conservative")]
+    return responses[0]
+
 class LocalConversationEngine:
     """Enhanced fast local conversation system with advanced creativity controls"""
+
+    # Shared across instances; built once at import
+    response_patterns = _RESPONSE_PATTERNS
     
     def __init__(self, creativity_level: float = 0.7):
         self.creativity_level = creativity_level
         self.conversation_history = []
-        self.response_patterns = self.load_response_patterns()
-        self.context_memory = []
         self.max_memory = 10
+        # Bounded ring buffer: appends past max_memory drop the oldest entry
+        self.context_memory = deque(maxlen=self.max_memory)
         self.user_profile = {}
+        # Debounced persistence state (see save_to_disk / flush_to_disk)
+        self._dirty = False
+        self._last_flush = 0.0
+        # Mirrors advanced_settings['remember_local_profile']; kept in sync by update_advanced_settings
+        self._remember = True
+        # Per-engine RNG so selection doesn't contend on the global random state
+        self._rng = random.Random()
+        atexit.register(self.flush_to_disk)
+    
+    @property
+    def creativity_level(self) -> float:
+        return self._creativity_level
+
+    @creativity_level.setter
+    def creativity_level(self, level: float):
+        # Resolve the response tier and selection handler once per change, not per message
+        self._creativity_level = level
+        self._response_tier = _RESPONSE_TIERS[bisect_left(_RESPONSE_TIER_THRESHOLDS, level)]
+        self._select = _TIER_HANDLERS[bisect_left(_TIER_THRESHOLDS, level)]
     
     def set_creativity(self, level: float):
         """Update creativity level and adjust response patterns accordingly"""
@@ -83,21 +414,17 @@ class LocalConversationEngine:
     def set_memory_size(self, size: int):
         """Update conversation memory size"""
         self.max_memory = max(5, min(50, size))
-        # Trim existing memory if needed
-        if len(self.context_memory) > self.max_memory:
-            self.context_memory = self.context_memory[-self.max_memory:]
+        # Rebuild with the new bound, keeping the most recent entries
+        self.context_memory = deque(self.context_memory, maxlen=self.max_memory)
     
     def add_to_memory(self, user_input: str, response: str):
         """Add interaction to conversation memory"""
         self.context_memory.append({
             'user': user_input.lower().strip(),
             'response': response,
-            'timestamp': datetime.now().isoformat()
+            'timestamp': _memory_timestamp()
         })
-        
-        # Maintain memory limit
-        if len(self.context_memory) > self.max_memory:
-            self.context_memory.pop(0)
+        self._dirty = True
 
     def to_dict(self) -> Dict[str, object]:
         try:
@@ -112,8 +439,8 @@ class LocalConversationEngine:
     def load_from_dict(self, data: Dict[str, object]):
         try:
             mem = data.get("context_memory", []) if isinstance(data, dict) else []
-            if isinstance(mem, list):
-                self.context_memory = list(mem)
+            if not isinstance(mem, list):
+                mem = self.context_memory
             prof = data.get("user_profile", {}) if isinstance(data, dict) else {}
             if isinstance(prof, dict):
                 self.user_profile = dict(prof)
@@ -122,17 +449,32 @@ class LocalConversationEngine:
                 self.max_memory = max(5, min(50, int(max_mem)))
             except Exception:
                 pass
-            if len(self.context_memory) > self.max_memory:
-                self.context_memory = self.context_memory[-self.max_memory:]
+            self.context_memory = deque(mem, maxlen=self.max_memory)
         except Exception:
             pass
 
     def save_to_disk(self):
-        path = _get_local_engine_profile_path()
+        if _write_local_profile(self.to_dict()):
+            self._dirty = False
+            self._last_flush = time.monotonic()
+
+    def save_in_background(self):
+        """Snapshot memory now and write it on the persist worker"""
+        data = self.to_dict()
+        self._dirty = False
+        self._last_flush = time.monotonic()
+
+        def _write():
+            if not _write_local_profile(data):
+                # Leave it for the next save or the exit-time flush
+                self._dirty = True
+        _persist_pool().submit(_write)
+
+    def flush_to_disk(self):
+        """Write pending memory changes, if any, when profile saving is enabled"""
         try:
-            payload = self.to_dict()
-            with open(path, "w", encoding="utf-8") as f:
-                json.dump(payload, f, indent=2)
+            if self._dirty and self._remember:
+                self.save_to_disk()
         except Exception:
             pass
 
@@ -141,292 +483,203 @@ class LocalConversationEngine:
         try:
             if not os.path.exists(path):
                 return
-            with open(path, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            with open(path, "rb") as f:
+                data = _json_loads(f.read())
             if isinstance(data, dict):
                 self.load_from_dict(data)
         except Exception:
             pass
 
     def clear_disk_data(self):
-        path = _get_local_engine_profile_path()
-        try:
+        def _remove():
+            path = _get_local_engine_profile_path()
             if os.path.exists(path):
                 os.remove(path)
+        # Nothing left to flush; cleared first so no new save is queued after the removal
+        self._dirty = False
+        try:
+            # Queued behind any pending background save, so that save can't recreate the file;
+            # not waited on, since callers run on the GUI thread
+            _persist_pool().submit(_remove)
         except Exception:
             pass
     
-    def load_response_patterns(self) -> Dict[str, List[str]]:
-        """Load enhanced conversational response patterns with creativity variations"""
-        return {
-            "greetings": {
-                "conservative": [
-                    "Hello! How can I assist you today?",
-                    "Hi there! What can I help you with?",
-                    "Good day! How may I help you?"
-                ],
-                "balanced": [
-                    "Hello! How can I assist you today?",
-                    "Hi there! What can I help you with?",
-                    "Good to see you! What's on your mind?",
-                    "Hey! Ready to help with whatever you need.",
-                    "Greetings! How may I be of service?"
-                ],
-                "creative": [
-                    "Hello there, wonderful human! What adventure shall we embark on today?",
-                    "Greetings, my friend! What fascinating topic can we explore together?",
-                    "Hey there! I'm buzzing with excitement to help you with anything!",
-                    "Well hello! What delightful challenge can I tackle for you today?",
-                    "Salutations! Ready to dive into whatever's on your brilliant mind!"
-                ]
-            },
-            "how_are_you": {
-                "conservative": [
-                    "I'm functioning well, thank you. How are you?",
-                    "All systems operational. How can I help?",
-                    "I'm doing fine. What can I do for you?"
-                ],
-                "balanced": [
-                    "I'm doing great, thank you for asking! How are you?",
-                    "All systems running smoothly! How's your day going?",
-                    "Fantastic, thanks! What can I help you accomplish today?",
-                    "I'm here and ready to help! What's new with you?"
-                ],
-                "creative": [
-                    "I'm absolutely fantastic! My circuits are practically humming with joy! How's your day treating you?",
-                    "Couldn't be better! I'm like a digital ray of sunshine today! What's got you curious?",
-                    "I'm thriving in the digital realm! Every conversation energizes me. How are you doing, my friend?",
-                    "Spectacular! I'm feeling particularly clever today. What puzzle can we solve together?"
-                ]
-            },
-            "thanks": {
-                "conservative": [
-                    "You're welcome. Anything else I can help with?",
-                    "Glad to help. Is there anything else?",
-                    "No problem. What else can I do?"
-                ],
-                "balanced": [
-                    "You're very welcome! Anything else I can help with?",
-                    "Happy to help! Is there anything else you need?",
-                    "My pleasure! Let me know if you need anything else.",
-                    "Glad I could assist! What else can I do for you?"
-                ],
-                "creative": [
-                    "Absolutely my pleasure! Helping you brightens my entire digital day!",
-                    "You're so welcome! It's like digital dopamine when I can be useful!",
-                    "Aww, you're too kind! I live for moments like these. What's next on our agenda?",
-                    "The pleasure was all mine! I'm practically glowing with satisfaction right now!"
-                ]
-            },
-            "capabilities": {
-                "conservative": [
-                    "I can help with weather, web searches, system commands, and conversation.",
-                    "My functions include weather information, internet searches, and system operations.",
-                    "I provide weather data, search results, system commands, and general assistance."
-                ],
-                "balanced": [
-                    "I can help with weather, web searches, system commands, and general conversation!",
-                    "I'm great at finding information, controlling your system, checking weather, and chatting!",
-                    "Weather updates, web searches, opening programs, and friendly conversation are my specialties!"
-                ],
-                "creative": [
-                    "Oh, I'm like a digital Swiss Army knife! Weather wizardry, web search sorcery, system command mastery, and conversation that'll knock your socks off!",
-                    "I'm your personal digital genie! I grant wishes for weather info, conjure search results from the internet, command your system like magic, and chat with the enthusiasm of a thousand coffee shots!",
-                    "Think of me as your AI sidekick! I can forecast weather like a meteorologist, search the web faster than you can blink, control your computer like a digital puppeteer, and chat with more personality than a talk show host!"
-                ]
-            },
-            "confused": {
-                "conservative": [
-                    "I don't understand. Please clarify.",
-                    "Could you rephrase that?",
-                    "Please provide more information."
-                ],
-                "balanced": [
-                    "I'm not quite sure I understand. Could you rephrase that?",
-                    "Could you clarify what you're looking for?",
-                    "I want to help, but I need a bit more information."
-                ],
-                "creative": [
-                    "Hmm, you've got me scratching my digital head! Could you paint that picture a bit clearer for me?",
-                    "Oops, my understanding circuits are a bit tangled! Mind rewording that masterpiece?",
-                    "I'm drawing a delightful blank here! Help me connect the dots with a little more detail?"
-                ]
-            },
-            "default_responses": {
-                "conservative": [
-                    "I see. What would you like to know about that?",
-                    "That's interesting. How can I help?",
-                    "Please tell me more about what you need."
-                ],
-                "balanced": [
-                    "That's interesting! Tell me more about that.",
-                    "I see! What would you like to know about it?",
-                    "Fascinating! How can I help you with that?",
-                    "That sounds intriguing! What specifically interests you about it?"
-                ],
-                "creative": [
-                    "Ooh, that's got my curiosity circuits firing on all cylinders! Spill the details!",
-                    "Now THAT sounds like an adventure waiting to happen! What's the scoop?",
-                    "My interest is officially piqued! Let's dive deep into this rabbit hole together!",
-                    "You've struck digital gold with that topic! I'm all ears (well, all sensors)!"
-                ]
-            }
-        }
+    def load_response_patterns(self) -> Dict[str, Dict[str, Tuple[str, ...]]]:
+        """Return the shared conversational response patterns"""
+        return _RESPONSE_PATTERNS
     
     def get_creativity_tier(self) -> str:
         """Determine creativity tier based on current level"""
-        if self.creativity_level <= 0.3:
-            return "conservative"
-        elif self.creativity_level <= 0.7:
-            return "balanced"
-        else:
-            return "creative"
+        return self._response_tier
     
     def analyze_intent(self, message: str) -> str:
         """Enhanced intent analysis with context awareness"""
-        message_lower = message.lower().strip()
-        
-        # Check conversation memory for context
-        recent_context = self.context_memory[-3:] if self.context_memory else []
-        
-        # Basic intent patterns
-        if any(word in message_lower for word in ["hello", "hi", "hey", "good morning", "good afternoon", "greetings"]):
-            return "greetings"
-        elif any(phrase in message_lower for phrase in ["how are you", "how's it going", "how do you feel"]):
-            return "how_are_you" 
-        elif any(word in message_lower for word in ["thanks", "thank you", "appreciate", "grateful"]):
-            return "thanks"
-        elif any(word in message_lower for word in ["good job", "excellent", "amazing", "awesome", "brilliant"]):
-            return "compliments"
-        elif any(phrase in message_lower for phrase in ["what can you do", "your abilities", "your capabilities", "help me"]):
-            return "capabilities"
-        elif any(word in message_lower for word in ["bye", "goodbye", "see you", "farewell", "exit"]):
-            return "farewells"
-        elif len(message_lower) < 15 and "?" in message_lower:
-            return "confused"
-        else:
-            return "default"
+        return _classify_intent(message.lower().strip())
     
     def select_response(self, responses: List[str]) -> str:
         """Select response based on creativity level with enhanced algorithms"""
         if not responses:
             return "I'm here to help!"
         
-        if self.creativity_level <= 0.3:
-            # Conservative: Always use first response for consistency
-            return responses[0]
-        elif self.creativity_level <= 0.5:
-            # Low-medium: Slight variation, prefer earlier responses
-            weights = [3, 2, 1] + [1] * (len(responses) - 3)
-            weights = weights[:len(responses)]
-            return random.choices(responses, weights=weights)[0]
-        elif self.creativity_level <= 0.7:
-            # Medium: Balanced selection with some preference for variety
-            weights = [2, 2, 2, 1, 1] + [1] * (len(responses) - 5)
-            weights = weights[:len(responses)]
-            return random.choices(responses, weights=weights)[0]
-        elif self.creativity_level <= 0.8:
-            # High-medium: More random, slight preference for later responses
-            weights = [1, 1, 2, 2, 3] + [2] * (len(responses) - 5)
-            weights = weights[:len(responses)]
-            return random.choices(responses, weights=weights)[0]
-        else:
-            # Maximum creativity: Completely random with potential for response mixing
-            if len(responses) > 1 and random.random() < 0.1:  # 10% chance to mix responses
-                selected = random.sample(responses, min(2, len(responses)))
-                return f"{selected[0]} {selected[1].lower()}"
-            return random.choice(responses)
+        return self._select(self._rng, responses)
     
+    def _flush_if_due(self):
+        """Save the profile in the background at most once per _PROFILE_FLUSH_INTERVAL"""
+        if self._remember and self._dirty and time.monotonic() - self._last_flush > _PROFILE_FLUSH_INTERVAL:
+            try:
+                self.save_in_background()
+            except Exception:
+                pass
+
     def generate_response(self, message: str) -> str:
         """Generate enhanced contextual response based on user input"""
+        # Conservative tier is deterministic: short messages (greetings, thanks)
+        # are served from the memoized reply
+        message_lower = message.lower().strip()
+        if (self._creativity_level <= _RESPONSE_TIER_THRESHOLDS[0]
+                and len(message_lower) <= _CANNED_MAX_LEN):
+            response = _canned_response(message_lower)
+            self.add_to_memory(message, response)
+            self._flush_if_due()
+            return response
+
         intent = self.analyze_intent(message)
         creativity_tier = self.get_creativity_tier()
         
         # Get appropriate response set
-        if intent in self.response_patterns:
-            if isinstance(self.response_patterns[intent], dict):
-                responses = self.response_patterns[intent].get(creativity_tier, self.response_patterns[intent]["balanced"])
-            else:
-                responses = self.response_patterns[intent]
-        else:
-            responses = self.response_patterns["default_responses"].get(creativity_tier, 
-                                                                      self.response_patterns["default_responses"]["balanced"])
+        responses = _FLAT_RESPONSES.get((intent, creativity_tier)) or _FLAT_RESPONSES[("default_responses", creativity_tier)]
         
         # Select response based on creativity level
         response = self.select_response(responses)
         
         # Add to conversation memory
         self.add_to_memory(message, response)
-        try:
-            remember = advanced_settings.get('remember_local_profile', True)
-        except Exception:
-            remember = True
-        if remember:
-            try:
-                self.save_to_disk()
-            except Exception:
-                pass
+        self._flush_if_due()
         
         # High creativity: occasionally add personality flourishes
-        if self.creativity_level > 0.8 and random.random() < 0.15:
+        if self._creativity_level > 0.8 and self._rng.random() < 0.15:
             flourishes = [
                 " amazing", " spectacular", " fantastic", " wonderful", " brilliant", " awesome", " incredible", " extraordinary"
             ]
-            response += random.choice(flourishes)
+            response += self._rng.choice(flourishes)
         
         return response
 
-class OpenRouterAPI:
-    """OpenRouter API interface for accessing premium models"""
-    
-    def __init__(self, api_key: Optional[str] = None):
-        env_token = api_key or os.getenv("OPENROUTER_API_KEY")
-        self.api_key = env_token
-        self.base_url = "https://openrouter.ai/api/v1/chat/completions"
-        self.headers = {
-            "Authorization": f"Bearer {env_token}" if env_token else "",
-            "Content-Type": "application/json"
-        }
+# Worker threads for concurrent blocking I/O (speculative searches, raced fallbacks), created on first use
+_IO_POOL = None
+
+def _io_pool():
+    global _IO_POOL
+    if _IO_POOL is None:
+        from concurrent.futures import ThreadPoolExecutor
+        _IO_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="luna-io")
+    return _IO_POOL
+
+# Single background writer for settings and profile persistence; one worker keeps writes
+# in submission order. Created on first use.
+_PERSIST_POOL = None
+_PERSIST_POOL_LOCK = threading.Lock()
+
+def _persist_pool():
+    global _PERSIST_POOL
+    if _PERSIST_POOL is None:
+        with _PERSIST_POOL_LOCK:
+            if _PERSIST_POOL is None:
+                from concurrent.futures import ThreadPoolExecutor
+                _PERSIST_POOL = ThreadPoolExecutor(max_workers=1, thread_name_prefix="luna-persist")
+    return _PERSIST_POOL
+
+# Shared keep-alive HTTP session (OpenRouter, model status checks, weather), built on first use
+_HTTP_SESSION = None
+_HTTP_LOCK = threading.Lock()
+
+def _http_session():
+    """Return the pooled requests session, creating it on first call"""
+    global _HTTP_SESSION
+    if _HTTP_SESSION is None:
+        # Raced fallbacks can get here from several threads at once; build only one pool
+        with _HTTP_LOCK:
+            if _HTTP_SESSION is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                session = requests.Session()
+                # Hosts other than OpenRouter never retry at the transport level; the OpenRouter
+                # host gets its own retrying adapter from _configure_openrouter_retries
+                adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=0)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _HTTP_SESSION = session
+    return _HTTP_SESSION
+
+# Bulkhead: caps concurrent OpenRouter requests (queries and status pings) so a burst
+# can't take every pooled connection. Sized from 'openrouter_concurrency' on first use.
+_OPENROUTER_SLOTS = None
+
+def _openrouter_slots() -> threading.BoundedSemaphore:
+    global _OPENROUTER_SLOTS
+    if _OPENROUTER_SLOTS is None:
+        limit = 8
         try:
-            masked = (self.api_key[:8] + "..." + self.api_key[-4:]) if self.api_key and len(self.api_key) > 12 else ("present" if self.api_key else "missing")
-            print(f"[DEBUG] OpenRouter token at init: {masked if self.api_key else 'missing'}")
+            if settings_manager is not None:
+                limit = max(1, int(settings_manager.get('openrouter_concurrency', 8)))
         except Exception:
             pass
-    
-    def query_model(self, model_id: str, inputs: str, max_tokens: int = 150) -> str:
-        """Query a model via OpenRouter"""
-        try:
-            if not self.api_key:
-                raise RuntimeError("OpenRouter API key not configured")
-            
-            payload = {
-                "model": model_id,
-                "messages": [
-                    {"role": "user", "content": inputs}
-                ],
-                "max_tokens": max_tokens,
-                "temperature": 0.7
-            }
-            
-            response = requests.post(self.base_url, headers=self.headers, json=payload, timeout=30)
-            
-            if response.status_code == 200:
-                data = response.json()
-                if 'choices' in data and len(data['choices']) > 0:
-                    return data['choices'][0]['message']['content'].strip()
-                return "Empty response from OpenRouter"
-            else:
-                err_text = response.text or ""
-                try:
-                    err_json = response.json()
-                    if isinstance(err_json, dict) and 'error' in err_json:
-                        err_text = str(err_json['error'])
-                except Exception:
-                    pass
-                print(f"OpenRouter API Error: {response.status_code} - {err_text}")
-                raise RuntimeError(f"OpenRouter request failed: {response.status_code}")
-        except Exception as e:
-            raise e
+        _OPENROUTER_SLOTS = threading.BoundedSemaphore(limit)
+    return _OPENROUTER_SLOTS
+
+# Retry budget currently set for the OpenRouter host (None until first configured) and the
+# adapter carrying it; the adapter is mounted once so its warm connections survive changes
+_OPENROUTER_RETRIES = [None]
+_OPENROUTER_ADAPTER = None
+# Longest wait (seconds) a 429/503 Retry-After header may impose before a transport retry
+_RETRY_AFTER_CAP = 5.0
+
+def _configure_openrouter_retries(retries: int):
+    """Mount transport-level retry/backoff for the OpenRouter host; no-op if unchanged"""
+    global _OPENROUTER_ADAPTER
+    retries = max(0, retries)
+    if _OPENROUTER_RETRIES[0] == retries:
+        return
+    from urllib.parse import urlsplit
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    class _CappedRetry(Retry):
+        # Honor Retry-After, but never let a server hint stall a chat call or ping for long
+        def get_retry_after(self, response):
+            retry_after = super().get_retry_after(response)
+            return None if retry_after is None else min(retry_after, _RETRY_AFTER_CAP)
+
+    parts = urlsplit(openrouter_api.base_url)
+    retry = _CappedRetry(
+        total=retries,
+        backoff_factor=0.5,
+        status_forcelist=(429, 502, 503, 504, 524),
+        allowed_methods=frozenset({"GET", "POST"}),
+        respect_retry_after_header=True,
+        # Hand the final response back so query_model can classify it
+        raise_on_status=False,
+    )
+    if _OPENROUTER_ADAPTER is None:
+        _OPENROUTER_ADAPTER = HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=retry)
+        _http_session().mount(f"{parts.scheme}://{parts.netloc}/", _OPENROUTER_ADAPTER)
+    else:
+        # The adapter reads max_retries on every send
+        _OPENROUTER_ADAPTER.max_retries = retry
+    _OPENROUTER_RETRIES[0] = retries
+
+_SANITIZE_RE = re.compile(r'[^0-9A-Za-z]')
+
+@lru_cache(maxsize=64)
+def _sanitize(mid: str) -> str:
+    """Model id -> env-var-safe suffix"""
+    return _SANITIZE_RE.sub('_', mid)
+
+@lru_cache(maxsize=64)
+def _endpoint_for(model_id: str) -> Optional[str]:
+    """Per-model endpoint override from OPENROUTER_ENDPOINT__{SANITIZED_MODEL_ID}, if any"""
+    override = os.getenv(f"OPENROUTER_ENDPOINT__{_sanitize(model_id)}")
+    return override.strip() if override else None
 
 class OpenRouterAPI:
     """OpenRouter API interface for various models"""
@@ -435,21 +688,24 @@ class OpenRouterAPI:
         env_token = api_key or os.getenv("OPENROUTER_API_KEY")
         self.api_key = env_token
         self.base_url = os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1/chat/completions")
-        self.headers = ({"Authorization": f"Bearer {env_token}"} if env_token else {})
-        try:
-            masked = (self.api_key[:4] + "..." + self.api_key[-4:]) if self.api_key and len(self.api_key) > 8 else ("present" if self.api_key else "missing")
-            print(f"[DEBUG] OpenRouter token at init: {masked if self.api_key else 'missing'}; headers set: {bool(self.headers)}")
-        except Exception:
-            pass
-    
+        # Built once and only mutated afterwards, so references to it stay valid
+        self.headers = {}
+        if env_token:
+            self.headers["Authorization"] = f"Bearer {env_token}"
+        if _DEBUG:
+            print(f"[DEBUG] OpenRouter token at init: {_mask(self.api_key)}; headers set: {bool(self.headers)}")
+
+    def set_api_key(self, token: str):
+        """Apply a new API token to the shared headers map"""
+        self.api_key = token
+        self.headers["Authorization"] = f"Bearer {token}"
+
     def query_model(self, model_id: str, inputs: str, max_tokens: int = 150) -> str:
         """Query a specific OpenRouter model"""
+        import requests
         try:
             # Allow per-model endpoint overrides via env: OPENROUTER_ENDPOINT__{SANITIZED_MODEL_ID}
-            def _sanitize(mid: str) -> str:
-                return ''.join(ch if ch.isalnum() else '_' for ch in mid)
-            override = os.getenv(f"OPENROUTER_ENDPOINT__{_sanitize(model_id)}")
-            url = override.strip() if override else self.base_url
+            url = _endpoint_for(model_id) or self.base_url
             
             payload = {
                 "model": model_id,
@@ -458,7 +714,8 @@ class OpenRouterAPI:
                 "temperature": 0.7
             }
             
-            response = requests.post(url, headers=self.headers, json=payload, timeout=30)
+            with _openrouter_slots():
+                response = _http_session().post(url, headers=self.headers, json=payload, timeout=30)
             
             if response.status_code == 200:
                 # Handle OpenRouter response format
@@ -476,48 +733,10 @@ class OpenRouterAPI:
                     print(f"Failed to parse OpenRouter response: {e}")
                     raise RuntimeError(f"Failed to parse OpenRouter response: {e}")
             else:
-                # Try to parse structured error
-                err_text = response.text or ""
-                try:
-                    err_json = response.json()
-                    if isinstance(err_json, dict) and 'error' in err_json:
-                        err_text = str(err_json['error'])
-                except Exception:
-                    pass
-
-                print(f"HF API Error: {response.status_code} - {err_text}")
-
-                # Detect paused/loading states explicitly and trigger fallback upstream
-                lower_err = err_text.lower()
-                if "paused" in lower_err or "space is paused" in lower_err:
-                    raise RuntimeError("HF endpoint paused")
-                if "loading" in lower_err or response.status_code in (503, 524):
-                    raise RuntimeError("HF endpoint loading")
-
-                # Raise rich error with status code so caller can make smart decisions
-                if response.status_code in (401, 403):
-                    raise HFRequestError(response.status_code, "HF authentication/authorization error")
-                if response.status_code == 429:
-                    raise HFRequestError(response.status_code, "HF rate limit exceeded")
-                if response.status_code == 400:
-                    # Common case: paused/loading endpoints return 400
-                    # Try to extract error text for UX
-                    err_txt = ""
-                    try:
-                        err_json = response.json()
-                        err_txt = err_json.get("error") or err_json.get("message") or ""
-                    except Exception:
-                        pass
-                    msg = f"Bad Request: {err_txt}" if err_txt else "Bad Request"
-                    raise HFRequestError(400, msg)
-                if response.status_code == 404:
-                    raise HFRequestError(404, "Model not found or endpoint removed")
-                # Generic failure
-                raise HFRequestError(response.status_code, f"HF request failed: {response.status_code}")
+                self._raise_for_error(response)
                 
         except requests.exceptions.Timeout as e:
-            # Propagate so upstream can perform fallback
-            raise e
+            raise TransientError(-1, f"OpenRouter request timed out: {e}")
         except HFRequestError:
             # Pass through
             raise
@@ -525,6 +744,146 @@ class OpenRouterAPI:
             # Wrap unknown errors
             raise HFRequestError(-1, str(e))
 
+    def stream_model(self, model_id: str, inputs: str, max_tokens: int = 150):
+        """Yield completion text from a specific OpenRouter model as it is generated (SSE)"""
+        import requests
+        url = _endpoint_for(model_id) or self.base_url
+        payload = {
+            "model": model_id,
+            "messages": [{"role": "user", "content": inputs}],
+            "max_tokens": max_tokens,
+            "temperature": 0.7,
+            "stream": True
+        }
+        try:
+            # The slot covers opening the stream only: the body is read at the consumer's
+            # pace, and a slow reader must not hold up other OpenRouter calls
+            with _openrouter_slots():
+                response = _http_session().post(url, headers=self.headers, json=payload, timeout=30, stream=True)
+            try:
+                if response.status_code != 200:
+                    self._raise_for_error(response)
+                for line in response.iter_lines(decode_unicode=True):
+                    # Skip keep-alive comments (": OPENROUTER PROCESSING") and blank separators
+                    if not line or not line.startswith("data:"):
+                        continue
+                    data = line[5:].strip()
+                    if data == "[DONE]":
+                        break
+                    try:
+                        chunk = _json_loads(data)
+                    except Exception:
+                        continue
+                    if chunk.get('error'):
+                        # Upstream failures after the 200 arrive as an error event
+                        raise HFRequestError(-1, f"OpenRouter stream error: {chunk['error']}")
+                    for choice in chunk.get('choices') or ():
+                        delta = (choice.get('delta') or {}).get('content')
+                        if delta:
+                            yield delta
+            finally:
+                response.close()
+        except requests.exceptions.Timeout as e:
+            raise TransientError(-1, f"OpenRouter request timed out: {e}")
+        except HFRequestError:
+            raise
+        except Exception as e:
+            raise HFRequestError(-1, str(e))
+
+    @staticmethod
+    def _raise_for_error(response):
+        """Raise the typed HFRequestError matching a non-200 OpenRouter response"""
+        # Parse the body once: structured error if possible, raw text otherwise
+        try:
+            err_json = response.json()
+            if isinstance(err_json, dict):
+                err_text = str(err_json.get('error') or err_json.get('message') or err_json)
+            else:
+                err_text = str(err_json)
+        except Exception:
+            err_text = response.text or ""
+
+        print(f"HF API Error: {response.status_code} - {err_text}")
+
+        # Detect paused/loading states explicitly and trigger fallback upstream
+        lower_err = err_text.lower()
+        if "paused" in lower_err:
+            raise PausedError(response.status_code, "HF endpoint paused")
+        if "loading" in lower_err or response.status_code in (503, 524):
+            raise TransientError(response.status_code, "HF endpoint loading")
+
+        # Raise rich error with status code so caller can make smart decisions
+        if response.status_code in (401, 403):
+            raise AuthError(response.status_code, "HF authentication/authorization error")
+        if response.status_code == 429:
+            raise RateLimitError(response.status_code, "HF rate limit exceeded")
+        if response.status_code == 400:
+            # Common case: paused/loading endpoints return 400
+            msg = f"Bad Request: {err_text}" if err_text else "Bad Request"
+            raise HFRequestError(400, msg)
+        if response.status_code == 404:
+            raise HFRequestError(404, "Model not found or endpoint removed")
+        # Generic failure
+        raise HFRequestError(response.status_code, f"HF request failed: {response.status_code}")
+
+
+class CircuitBreaker:
+    """Per-model failure gate: opens after repeated failures, lets one probe through after a cooldown"""
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, fail_threshold: int = 5, reset_after: float = 30.0):
+        self.fail_threshold = fail_threshold
+        self.reset_after = reset_after
+        self.failures = 0
+        self.state = self.CLOSED
+        self.opened_at = 0.0
+        self.last_error = None
+        # Raced alternates report from worker threads
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Return False while open; after the cooldown let a single trial call through"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if time.monotonic() - self.opened_at < self.reset_after:
+                # Still cooling down, or a trial is already in flight
+                return False
+            # Restart the clock so a trial that never reports back can't wedge the breaker
+            self.state = self.HALF_OPEN
+            self.opened_at = time.monotonic()
+            return True
+
+    def is_open(self) -> bool:
+        """True while allow() would refuse, without starting a half-open trial"""
+        with self._lock:
+            return self.state != self.CLOSED and time.monotonic() - self.opened_at < self.reset_after
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.state = self.CLOSED
+            self.last_error = None
+
+    def record_failure(self, error: Optional[str] = None):
+        with self._lock:
+            self.failures += 1
+            self.last_error = error
+            if self.state == self.HALF_OPEN or self.failures >= self.fail_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+# One breaker per model id, created on first use
+_BREAKERS: Dict[str, CircuitBreaker] = {}
+
+def _breaker_for(model_id: str) -> CircuitBreaker:
+    breaker = _BREAKERS.get(model_id)
+    if breaker is None:
+        # setdefault keeps concurrent first uses on the same instance
+        breaker = _BREAKERS.setdefault(model_id, CircuitBreaker())
+    return breaker
+
 
 # Initialize the conversation engine and APIs globally
 conversation_engine = LocalConversationEngine()
@@ -554,6 +913,7 @@ def set_settings_manager(manager: 'SettingsManager'):
     """Set the settings manager instance to use for application settings."""
     global settings_manager
     settings_manager = manager
+    _bump_ui_models_version()
     try:
         level = settings_manager.get('ai_creativity', 0.7)
         set_ai_creativity(level)
@@ -565,6 +925,7 @@ def set_settings_manager(manager: 'SettingsManager'):
         advanced_settings['current_model'] = settings_manager.get('current_ai_model', 'local_engine')
         remember = settings_manager.get('save_chat_history', True)
         advanced_settings['remember_local_profile'] = bool(remember)
+        conversation_engine._remember = bool(remember)
         if remember:
             try:
                 conversation_engine.load_from_disk()
@@ -577,13 +938,8 @@ def set_openrouter_api_token(token: Optional[str]):
     """Update the OpenRouter API token at runtime."""
     try:
         if token and isinstance(token, str) and token.strip():
-            openrouter_api.api_key = token.strip()
-            openrouter_api.headers = {"Authorization": f"Bearer {openrouter_api.api_key}"}
-            try:
-                masked = (openrouter_api.api_key[:4] + "..." + openrouter_api.api_key[-4:]) if len(openrouter_api.api_key) > 8 else "applied"
-                print(f"[OK] OpenRouter token applied at runtime: {masked}")
-            except Exception:
-                pass
+            openrouter_api.set_api_key(token.strip())
+            print(f"[OK] OpenRouter token applied at runtime: {_mask(openrouter_api.api_key)}")
             return True
     except Exception:
         pass
@@ -593,15 +949,11 @@ def reload_openrouter_token_from_env() -> bool:
     """Reload .env and apply OpenRouter token from environment. Returns True if token applied."""
     try:
         _load_env_from_dotenv()
+        _endpoint_for.cache_clear()
         tok = os.getenv("OPENROUTER_API_KEY")
         if tok and tok.strip():
-            openrouter_api.api_key = tok.strip()
-            openrouter_api.headers = {"Authorization": f"Bearer {openrouter_api.api_key}"}
-            try:
-                masked = (openrouter_api.api_key[:4] + "..." + openrouter_api.api_key[-4:]) if len(openrouter_api.api_key) > 8 else "applied"
-                print(f"[OK] OpenRouter token reloaded from env: {masked}")
-            except Exception:
-                pass
+            openrouter_api.set_api_key(tok.strip())
+            print(f"[OK] OpenRouter token reloaded from env: {_mask(openrouter_api.api_key)}")
             return True
         else:
             print("[INFO] No OpenRouter token found in environment")
@@ -620,22 +972,26 @@ def update_advanced_settings(settings_dict: dict):
     """Update advanced settings from the settings manager"""
     global advanced_settings
     advanced_settings.update(settings_dict)
+    _bump_ui_models_version()
     # Keep conversation engine in sync
     if 'conversation_memory' in settings_dict:
         conversation_engine.set_memory_size(settings_dict['conversation_memory'])
+    if 'remember_local_profile' in settings_dict:
+        conversation_engine._remember = bool(settings_dict['remember_local_profile'])
     if 'response_delay' in settings_dict:
         pass  # handled in call_ai_api
 
-def _get_env_alt_models() -> list:
+def _get_env_alt_models() -> Tuple[str, ...]:
     """Read HF_ALT_MODELS env var as a comma-separated list of model IDs."""
     try:
-        raw = os.getenv("HF_ALT_MODELS", "")
-        if not raw:
-            return []
-        items = [m.strip() for m in raw.split(',') if m.strip()]
-        return items
+        return _parse_model_list(os.getenv("HF_ALT_MODELS", ""))
     except Exception:
-        return []
+        return ()
+
+@lru_cache(maxsize=8)
+def _parse_model_list(raw: str) -> Tuple[str, ...]:
+    """Comma-separated model ids -> unique ids in first-seen order"""
+    return tuple(dict.fromkeys(m.strip() for m in raw.split(',') if m.strip()))
 
 # Prefer the UI-declared available models when present to ensure consistency with the Luna UI
 def _get_ui_available_models() -> dict:
@@ -649,32 +1005,106 @@ def _get_ui_available_models() -> dict:
         pass
     return get_available_models()
 
+# Bumped when the settings source changes so caches derived from the UI model map are rebuilt
+_UI_MODELS_VERSION = 0
+
+def _bump_ui_models_version():
+    global _UI_MODELS_VERSION
+    _UI_MODELS_VERSION += 1
+
+@lru_cache(maxsize=4)
+def _openrouter_alts(current_model: str, version: int) -> Dict[str, dict]:
+    """UI-declared OpenRouter models other than current_model, in UI order; `version` only keys the cache"""
+    return {mid: info for mid, info in _get_ui_available_models().items()
+            if mid != current_model and info.get('type') == 'openrouter' and info.get('provider') == 'openrouter'}
+
+# Model ids OpenRouter currently lists, fetched in one GET and kept for _LIVE_MODELS_TTL
+# seconds; ids is None when the listing couldn't be fetched
+_LIVE_MODELS = {"ts": 0.0, "ids": None}
+_LIVE_MODELS_TTL = 60.0
+
+def _live_openrouter_models(timeout: float = 2.0) -> Optional[frozenset]:
+    """Return the set of model ids OpenRouter lists, or None if unknown"""
+    now = time.monotonic()
+    if _LIVE_MODELS["ts"] and now - _LIVE_MODELS["ts"] < _LIVE_MODELS_TTL:
+        return _LIVE_MODELS["ids"]
+    ids = None
+    try:
+        # .../api/v1/chat/completions -> .../api/v1/models
+        url = openrouter_api.base_url.rsplit('/chat/completions', 1)[0] + '/models'
+        resp = _http_session().get(url, timeout=timeout)
+        if resp.status_code == 200:
+            data = resp.json().get('data') or []
+            ids = frozenset(m['id'] for m in data if isinstance(m, dict) and m.get('id')) or None
+    except Exception as e:
+        print(f"Could not list OpenRouter models: {e}")
+    _LIVE_MODELS["ts"] = now
+    _LIVE_MODELS["ids"] = ids
+    return ids
+
+# model_id -> (monotonic timestamp, status dict) for recent status checks
+_STATUS_CACHE: Dict[str, Tuple[float, dict]] = {}
+_STATUS_TTL = 60.0
+
+def invalidate_model_status(model_id: str) -> None:
+    """Forget the cached status check for model_id so the next check pings it again"""
+    _STATUS_CACHE.pop(model_id, None)
+
 def check_openrouter_model_status(model_id: str, timeout: int = 5, max_tokens: int = 1) -> dict:
     """Lightweight check to determine a OpenRouter model endpoint status.
 
     Returns a dict: {'status': 'available'|'paused'|'loading'|'error', 'error': str|None}
     Note: 404 responses are treated as 'error' with message 'model not found or endpoint removed'.
+    Models whose circuit breaker is open are reported as 'error' without a network call.
     """
-    try:
-        # Only applicable to OpenRouter models
-        if model_id == 'local_engine':
-            return {'status': 'available', 'error': None}
+    # Only applicable to OpenRouter models
+    if model_id == 'local_engine':
+        return {'status': 'available', 'error': None}
 
+    now = time.monotonic()
+    cached = _STATUS_CACHE.get(model_id)
+    if cached is not None and now - cached[0] < _STATUS_TTL:
+        return dict(cached[1])
+
+    breaker = _breaker_for(model_id)
+    # Only look at the breaker: a ping must not take the half-open trial meant for a chat call
+    if breaker.is_open():
+        return {'status': 'error', 'error': f"skipped after repeated failures: {breaker.last_error or 'unknown error'}"}
+    result, status_code = _probe_openrouter_model(model_id, timeout, max_tokens)
+    if status_code == 200:
+        breaker.record_success()
+    elif status_code in (400, 404):
+        # Only responses saying the model itself is paused (400) or gone (404) count against
+        # it; rate limits, auth problems and ping timeouts say nothing about a chat call
+        breaker.record_failure(result['error'])
+    _STATUS_CACHE[model_id] = (now, result)
+    return dict(result)
+
+@lru_cache(maxsize=64)
+def _status_ping_body(model_id: str, max_tokens: int) -> bytes:
+    """Serialized status-ping request body, built once per model"""
+    return _json_dumps({
+        "model": model_id,
+        "messages": [{"role": "user", "content": "status ping"}],
+        "max_tokens": max_tokens,
+        "temperature": 0.1
+    })
+
+def _probe_openrouter_model(model_id: str, timeout: int, max_tokens: int) -> Tuple[dict, Optional[int]]:
+    """Send a minimal completion request; return (status dict, HTTP status or None if no response)"""
+    import requests
+    try:
         url = f"{openrouter_api.base_url}"
-        payload = {
-            "model": model_id,
-            "messages": [{"role": "user", "content": "status ping"}],
-            "max_tokens": max_tokens,
-            "temperature": 0.1
-        }
-        resp = requests.post(url, headers=openrouter_api.headers, json=payload, timeout=timeout)
+        headers = {**openrouter_api.headers, "Content-Type": "application/json"}
+        with _openrouter_slots():
+            resp = _http_session().post(url, headers=headers, data=_status_ping_body(model_id, max_tokens), timeout=timeout)
         try:
             data = resp.json()
         except Exception:
             data = None
 
         if resp.status_code == 200:
-            return {'status': 'available', 'error': None}
+            return {'status': 'available', 'error': None}, resp.status_code
         err_text = ''
         try:
             if isinstance(data, dict):
@@ -687,89 +1117,258 @@ def check_openrouter_model_status(model_id: str, timeout: int = 5, max_tokens: i
             guidance = ('Endpoint paused. See how pause works: '
                         'https://openrouter.ai/docs')
             msg = err_text or 'endpoint paused'
-            return {'status': 'paused', 'error': f"{msg}. {guidance}"}
+            return {'status': 'paused', 'error': f"{msg}. {guidance}"}, resp.status_code
         if 'loading' in err_text.lower() or resp.status_code in (503, 524):
-            return {'status': 'loading', 'error': err_text or 'endpoint loading'}
+            return {'status': 'loading', 'error': err_text or 'endpoint loading'}, resp.status_code
         if resp.status_code in (401, 403):
-            return {'status': 'error', 'error': 'authentication/authorization error'}
+            return {'status': 'error', 'error': 'authentication/authorization error'}, resp.status_code
         if resp.status_code == 429:
-            return {'status': 'error', 'error': 'rate limit exceeded'}
+            return {'status': 'error', 'error': 'rate limit exceeded'}, resp.status_code
         if resp.status_code == 404:
             # Provide guidance for 404s: often means no standard Inference API; use Providers or your own endpoint
             guidance = ('Check OpenRouter documentation: https://openrouter.ai/docs '
                         'and model availability: https://openrouter.ai/models')
-            return {'status': 'error', 'error': guidance}
-        return {'status': 'error', 'error': f"OpenRouter request failed: {resp.status_code}: {err_text}"}
+            return {'status': 'error', 'error': guidance}, resp.status_code
+        return {'status': 'error', 'error': f"OpenRouter request failed: {resp.status_code}: {err_text}"}, resp.status_code
     except requests.exceptions.Timeout:
-        return {'status': 'error', 'error': 'timeout'}
+        return {'status': 'error', 'error': 'timeout'}, None
+    except Exception as e:
+        return {'status': 'error', 'error': str(e)}, None
+
+def _race_alternates(model_ids: List[str], message: str) -> Tuple[Optional[Tuple[str, str]], Dict[str, Exception]]:
+    """Query alternate models concurrently; return the first (model_id, response) to succeed and per-model errors.
+
+    Callers filter out models whose breaker is open."""
+    from concurrent.futures import as_completed
+    errors: Dict[str, Exception] = {}
+    if not model_ids:
+        return None, errors
+
+    def _settle(mid, resp=None, exc=None):
+        if exc is not None:
+            if _DEBUG:
+                print(f"[DEBUG] Alternate OpenRouter model '{mid}' failed: {exc}")
+            errors[mid] = exc
+            if not isinstance(exc, AuthError):
+                _breaker_for(mid).record_failure(str(exc))
+            return False
+        if not str(resp).strip():
+            errors[mid] = HFRequestError(None, "empty response")
+            return False
+        _breaker_for(mid).record_success()
+        return True
+
+    if len(model_ids) == 1:
+        # Nothing to race; skip the pool hop
+        mid = model_ids[0]
+        if _DEBUG:
+            print(f"[DEBUG] Trying alternate OpenRouter model '{mid}'...")
+        try:
+            resp = openrouter_api.query_model(mid, message)
+        except Exception as e:
+            _settle(mid, exc=e)
+            return None, errors
+        return ((mid, resp) if _settle(mid, resp) else None), errors
+
+    if _DEBUG:
+        print(f"[DEBUG] Racing alternate OpenRouter models: {', '.join(model_ids)}")
+    futures = {_io_pool().submit(openrouter_api.query_model, mid, message): mid for mid in model_ids}
+    try:
+        for future in as_completed(futures):
+            mid = futures[future]
+            try:
+                resp = future.result()
+            except Exception as e:
+                _settle(mid, exc=e)
+                continue
+            if _settle(mid, resp):
+                return (mid, resp), errors
+    finally:
+        for future in futures:
+            future.cancel()
+    return None, errors
+
+def _try_alternates(alt_ids: List[str], message: str, cap: int, tried: int = 0,
+                    race: bool = True) -> Tuple[Optional[Tuple[str, str]], int, List[str]]:
+    """Try alternates until one answers or `cap` attempts are spent; returns (hit, tried, attempted ids)"""
+    attempted: List[str] = []
+    pending = iter(alt_ids)
+    while tried < cap:
+        # Race as many as the remaining budget allows, or one at a time when racing is off
+        size = cap - tried if race else 1
+        batch = []
+        for mid in pending:
+            # Open breakers are skipped before any request and don't use the budget
+            if _breaker_for(mid).allow():
+                batch.append(mid)
+                if len(batch) == size:
+                    break
+        if not batch:
+            break
+        attempted.extend(batch)
+        hit, errors = _race_alternates(batch, message)
+        if hit is not None:
+            return hit, tried, attempted
+        for mid in batch:
+            err = errors.get(mid)
+            # 404 means the model isn't served; skip without consuming an attempt
+            if getattr(err, 'status_code', None) == 404:
+                if _DEBUG:
+                    print(f"[DEBUG] Skipping alternate '{mid}' (404 not available): {err}")
+                continue
+            tried += 1
+    return None, tried, attempted
+
+# Auto-switch waiting for the persist worker; only the latest pending model id is written
+_PERSIST_PENDING = [None]
+_PERSIST_LOCK = threading.Lock()
+
+def _persist_current_model():
+    with _PERSIST_LOCK:
+        alt_id = _PERSIST_PENDING[0]
+        _PERSIST_PENDING[0] = None
+    if alt_id is None:
+        return
+    try:
+        if settings_manager is not None:
+            settings_manager.set('current_ai_model', alt_id)
     except Exception as e:
-        return {'status': 'error', 'error': str(e)}
+        print(f"Could not persist auto-switch to {alt_id}: {e}")
+
+def _switch_to_alternate(alt_id: str):
+    """Record an auto-switch to the alternate that answered; the settings write happens off-thread"""
+    try:
+        # In-memory state first so the next call already uses the alternate
+        update_advanced_settings({'current_model': alt_id})
+    except Exception:
+        pass
+    with _PERSIST_LOCK:
+        queued = _PERSIST_PENDING[0] is not None
+        _PERSIST_PENDING[0] = alt_id
+    if not queued:
+        _persist_pool().submit(_persist_current_model)
+
+# Query words that make a news search worthwhile
+_NEWS_WORDS = frozenset(('news', 'nfl', 'sports', 'score', 'game', 'today', 'latest', 'breaking'))
+
+
+def _format_search_results(results) -> List[str]:
+    """Format DDGS results as markdown entries, skipping untitled ones"""
+    if not results:
+        return []
+    # Pull each field into its own column once, then format row-wise
+    titles, bodies, urls, dates = zip(*(
+        (r.get('title', '').strip(), r.get('body', '').strip(), r.get('href') or r.get('url', ''), r.get('date', ''))
+        for r in results
+    ))
+    # Truncate bodies for speed
+    bodies = [b[:150].rsplit(' ', 1)[0] + "..." if len(b) > 150 else b for b in bodies]
+    # Format with clickable links using markdown
+    return [
+        f"**{t}**" + (f" ({d})" if d else "") + (f"\n{b}" if b else "") + (f"\n[View source]({u})" if u else "")
+        for t, b, u, d in zip(titles, bodies, urls, dates)
+        if t
+    ]
+
+# (normalized query, num_results) -> (monotonic timestamp, formatted result, succeeded).
+# Successful results are served fresh for _SEARCH_FRESH_TTL and then served stale while a
+# background refresh runs, up to _SEARCH_STALE_TTL; failures are cached briefly so
+# repeated questions don't hammer DDGS.
+_SEARCH_CACHE: "OrderedDict[Tuple[str, int], Tuple[float, str, bool]]" = OrderedDict()
+_SEARCH_CACHE_MAX = 512
+_SEARCH_FRESH_TTL = 120.0
+_SEARCH_STALE_TTL = 600.0
+_SEARCH_FAIL_TTL = 10.0
+_SEARCH_LOCK = threading.Lock()
+_SEARCH_REFRESHING = set()
+
+def _search_and_cache(query, num_results, key) -> str:
+    result, ok = _web_search(query, num_results)
+    with _SEARCH_LOCK:
+        _SEARCH_CACHE[key] = (time.monotonic(), result, ok)
+        _SEARCH_CACHE.move_to_end(key)
+        while len(_SEARCH_CACHE) > _SEARCH_CACHE_MAX:
+            _SEARCH_CACHE.popitem(last=False)
+    return result
+
+def _refresh_search(query, num_results, key):
+    try:
+        _search_and_cache(query, num_results, key)
+    finally:
+        with _SEARCH_LOCK:
+            _SEARCH_REFRESHING.discard(key)
 
 def enhanced_web_search(query, num_results=3):
-    """Enhanced web search with better error handling and result formatting"""
+    """Web search with a short-lived result cache keyed by the normalized query"""
+    key = (query.strip().lower(), num_results)
+    with _SEARCH_LOCK:
+        entry = _SEARCH_CACHE.get(key)
+    if entry is not None:
+        ts, result, ok = entry
+        age = time.monotonic() - ts
+        if age < (_SEARCH_FRESH_TTL if ok else _SEARCH_FAIL_TTL):
+            return result
+        if ok and age < _SEARCH_STALE_TTL:
+            # Serve the stale result now and refresh it in the background
+            with _SEARCH_LOCK:
+                start = key not in _SEARCH_REFRESHING
+                _SEARCH_REFRESHING.add(key)
+            if start:
+                threading.Thread(target=_refresh_search, args=(query, num_results, key), daemon=True).start()
+            return result
+    return _search_and_cache(query, num_results, key)
+
+def _web_search(query, num_results=3) -> Tuple[str, bool]:
+    """Enhanced web search with better error handling and result formatting.
+
+    Returns (text, ok); ok is False when the text is an apology rather than results."""
     try:
         query = query.strip()
         if not query or len(query) < 2:
-            return "Please provide a more specific search query."
+            return "Please provide a more specific search query.", False
         
         print(f"Searching for: {query}")
         search_results = []
+        from ddgs import DDGS
+        # One client per search, shared only by this search's methods: DDGS isn't
+        # documented as thread-safe, so no client is shared process-wide
+        ddgs = DDGS()
         
-        # Enhanced search methods with better fallbacks
+        # Enhanced search methods, numbered by priority; news only for news-like queries
         search_methods = [
-            lambda: DDGS().text(query, max_results=num_results),
-            lambda: DDGS().news(query, max_results=num_results) if any(word in query.lower() 
-                for word in ['news', 'nfl', 'sports', 'score', 'game', 'today', 'latest', 'breaking']) else [],
-            lambda: DDGS().text(query, region='us-en', max_results=num_results),
-            lambda: DDGS().text(f'"{query}"', max_results=num_results),  # Exact phrase search
+            (1, lambda: ddgs.text(query, max_results=num_results)),
+            (3, lambda: ddgs.text(query, region='us-en', max_results=num_results)),
+            (4, lambda: ddgs.text(f'"{query}"', max_results=num_results)),  # Exact phrase search
         ]
+        if _NEWS_WORDS.intersection(query.lower().split()):
+            search_methods.insert(1, (2, lambda: ddgs.news(query, max_results=num_results)))
         
-        for i, method in enumerate(search_methods):
+        # Run all methods at once, then take the highest-priority one with usable
+        # results; a failing method no longer delays the next by its own timeout
+        pool = _io_pool()
+        futures = [(i, pool.submit(lambda m=method: list(m()))) for i, method in search_methods]
+        for i, future in futures:
             try:
-                print(f"Trying search method {i+1}...")
-                results = list(method())
-                
-                if not results:
-                    continue
-                
-                for result in results:
-                    title = result.get('title', '').strip()
-                    body = result.get('body', '').strip() 
-                    url = result.get('href') or result.get('url', '')
-                    date = result.get('date', '')
-                    
-                    if title:
-                        # Format with clickable links using markdown
-                        result_text = f"**{title}**"
-                        if date:
-                            result_text += f" ({date})"
-                        if body:
-                            # Truncate body for speed
-                            if len(body) > 150:
-                                body = body[:150].rsplit(' ', 1)[0] + "..."
-                            result_text += f"\n{body}"
-                        if url:
-                            result_text += f"\n[View source]({url})"
-                        
-                        search_results.append(result_text)
-                
-                if search_results:
-                    print(f"Found {len(search_results)} results using method {i+1}")
-                    
-                    # Simplified header formatting
-                    header = f"Search results for '{query}':"
-                    
-                    # Join results with better spacing
-                    return header + "\n\n" + "\n\n".join(search_results)
-                    
+                results = future.result()
             except Exception as e:
-                print(f"Search method {i+1} failed: {e}")
+                print(f"Search method {i} failed: {e}")
                 continue
+            search_results = _format_search_results(results)
+            if search_results:
+                for _, pending in futures:
+                    pending.cancel()
+                print(f"Found {len(search_results)} results using method {i}")
+                
+                # Simplified header formatting
+                header = f"Search results for '{query}':"
+                
+                # Join results with better spacing
+                return header + "\n\n" + "\n\n".join(search_results), True
         
         # Enhanced instant answers fallback
         try:
             print("Trying instant answers...")
-            instant_results = list(DDGS().chat(query, max_results=2))
+            instant_results = list(ddgs.chat(query, max_results=2))
             if instant_results:
                 for answer in instant_results[:2]:
                     text = answer.get('text', '').strip()
@@ -780,15 +1379,38 @@ def enhanced_web_search(query, num_results=3):
                         
                 if search_results:
                     header = f"Search results for '{query}':"
-                    return header + "\n\n" + "\n\n".join(search_results)
+                    return header + "\n\n" + "\n\n".join(search_results), True
         except Exception as e:
             print(f"Instant answers failed: {e}")
         
-        return f"Sorry, I'm having trouble accessing search results for '{query}' right now."
+        return f"Sorry, I'm having trouble accessing search results for '{query}' right now.", False
             
     except Exception as e:
         print(f"Search function error: {e}")
-        return f"Search service is temporarily unavailable. Please try searching directly on Google for '{query}'."
+        return f"Search service is temporarily unavailable. Please try searching directly on Google for '{query}'.", False
+
+# Condition keyword -> emoji, checked in order against the lowercased description
+_WEATHER_EMOJIS = (
+    ('clear', '☀️'), ('clouds', '☁️'), ('rain', '🌧️'), ('snow', '❄️'),
+    ('thunderstorm', '⛈️'), ('drizzle', '🌦️'), ('mist', '🌫️'), ('fog', '🌫️'),
+)
+
+# city (lowercased) -> (monotonic timestamp, OpenWeatherMap payload) for successful lookups
+_WEATHER_CACHE: Dict[str, Tuple[float, dict]] = {}
+_WEATHER_TTL = 300.0
+
+def _fetch_weather(city: str, api_key: str) -> dict:
+    """Current conditions for a city, reusing a successful response for _WEATHER_TTL seconds"""
+    key = city.lower()
+    now = time.monotonic()
+    cached = _WEATHER_CACHE.get(key)
+    if cached is not None and now - cached[0] < _WEATHER_TTL:
+        return cached[1]
+    url = f"http://api.openweathermap.org/data/2.5/weather?q={city}&appid={api_key}&units=imperial"
+    data = _http_session().get(url, timeout=10).json()
+    if data.get("cod") == 200:
+        _WEATHER_CACHE[key] = (now, data)
+    return data
 
 def get_weather(city="Beavercreek,Ohio"):
     """Enhanced weather data with personality based on creativity.
@@ -819,10 +1441,9 @@ def get_weather(city="Beavercreek,Ohio"):
                 "file to enable weather."
             )
 
-    url = f"http://api.openweathermap.org/data/2.5/weather?q={city}&appid={api_key}&units=imperial"
+    import requests
     try:
-        response = requests.get(url, timeout=10)
-        data = response.json()
+        data = _fetch_weather(city, api_key)
         if data.get("cod") == 200:
             temp = data["main"]["temp"]
             desc = data["weather"][0]["description"]
@@ -837,11 +1458,12 @@ def get_weather(city="Beavercreek,Ohio"):
             elif creativity <= 0.7:
                 return f"🌤️ Weather in {city}: {desc.title()}, {temp}°F (feels like {feels_like}°F), humidity {humidity}%"
             else:
-                weather_emojis = {
-                    'clear': '☀️', 'clouds': '☁️', 'rain': '🌧️', 'snow': '❄️', 
-                    'thunderstorm': '⛈️', 'drizzle': '🌦️', 'mist': '🌫️', 'fog': '🌫️'
-                }
-                emoji = next((v for k, v in weather_emojis.items() if k in desc.lower()), '🌤️')
+                desc_lc = desc.lower()
+                emoji = '🌤️'
+                for key, value in _WEATHER_EMOJIS:
+                    if key in desc_lc:
+                        emoji = value
+                        break
                 
                 temp_comment = ""
                 if temp > 80:
@@ -851,7 +1473,7 @@ def get_weather(city="Beavercreek,Ohio"):
                 elif temp < 50:
                     temp_comment = " (cozy sweater weather!)"
                 
-                return f"Weather report for {city}! It's {desc.lower()} with {temp}°F{temp_comment} (feels like {feels_like}°F). Humidity is hanging out at {humidity}%. Perfect for whatever adventure you're planning!"
+                return f"{emoji} Weather report for {city}! It's {desc_lc} with {temp}°F{temp_comment} (feels like {feels_like}°F). Humidity is hanging out at {humidity}%. Perfect for whatever adventure you're planning!"
         else:
             error_msg = data.get('message', 'Unknown error')
             if conversation_engine.creativity_level > 0.7:
@@ -866,73 +1488,107 @@ def get_weather(city="Beavercreek,Ohio"):
     except Exception as e:
         return f"Weather service error: {e}"
 
+# Evaluated once; the OS doesn't change while the app runs
+_IS_WINDOWS = sys.platform == "win32"
+
+def _open_notepad(creativity: float) -> str:
+    import subprocess
+    if _IS_WINDOWS:
+        subprocess.Popen(["notepad.exe"])
+        if creativity > 0.7:
+            return "Notepad is now ready for your brilliant thoughts! Time to write something amazing!"
+        elif creativity > 0.3:
+            return "Opening Notepad for you..."
+        else:
+            return "Opening Notepad..."
+    else:
+        subprocess.Popen(["gedit"])
+        return "Opening text editor..." if creativity <= 0.3 else "Text editor at your service!"
+
+def _open_calculator(creativity: float) -> str:
+    import subprocess
+    if _IS_WINDOWS:
+        subprocess.Popen(["calc.exe"])
+        if creativity > 0.7:
+            return "Calculator is ready to crunch some numbers! Let's solve the mysteries of mathematics!"
+        elif creativity > 0.3:
+            return "Opening Calculator for you..."
+        else:
+            return "Opening Calculator..."
+    else:
+        subprocess.Popen(["gnome-calculator"])
+        return "Opening Calculator..." if creativity <= 0.3 else "Calculator ready for action!"
+
+def _open_browser(creativity: float) -> str:
+    import webbrowser
+    webbrowser.open("https://www.google.com")
+    if creativity > 0.7:
+        return "Your digital gateway to the internet is now open! Happy browsing, explorer!"
+    elif creativity > 0.3:
+        return "Opening your web browser..."
+    else:
+        return "Opening web browser..."
+
+def _open_file_manager(creativity: float) -> str:
+    import subprocess
+    if _IS_WINDOWS:
+        subprocess.Popen(["explorer.exe"])
+        response = "Opening File Explorer..."
+    else:
+        subprocess.Popen(["nautilus"])
+        response = "Opening File Manager..."
+    
+    if creativity > 0.7:
+        return f"📁 {response.replace('...', '')} Time to organize those digital treasures!"
+    elif creativity > 0.3:
+        return f"📁 {response}"
+    else:
+        return response
+
+# Win32 virtual-key codes sent directly via user32 instead of spawning PowerShell
+_VK_MENU = 0x12
+_VK_SNAPSHOT = 0x2C
+_VK_VOLUME_MUTE = 0xAD
+_VK_VOLUME_DOWN = 0xAE
+_VK_VOLUME_UP = 0xAF
+_KEYEVENTF_KEYUP = 0x0002
+
+def _tap_keys(*vks: int):
+    """Press the given virtual keys in order and release them in reverse (Windows only)"""
+    import ctypes
+    user32 = ctypes.windll.user32
+    for vk in vks:
+        user32.keybd_event(vk, 0, 0, 0)
+    for vk in reversed(vks):
+        user32.keybd_event(vk, 0, _KEYEVENTF_KEYUP, 0)
+
+# "open ..." targets in priority order: (trigger substrings, handler)
+_OPEN_APP_HANDLERS = (
+    (("notepad",), _open_notepad),
+    (("calculator",), _open_calculator),
+    (("browser", "chrome"), _open_browser),
+    (("file manager", "explorer"), _open_file_manager),
+)
+
 def execute_system_command(command):
-    """Enhanced system commands with creative responses"""
+    """Enhanced system commands with creative responses (expects an already-lowercased command)"""
+    creativity = conversation_engine.creativity_level
     if not advanced_settings.get('enable_system_commands', True):
-        if conversation_engine.creativity_level > 0.7:
+        if creativity > 0.7:
             return "System commands are taking a break right now! You can enable them in the advanced settings."
         else:
             return "System commands are currently disabled. Please enable them in the advanced settings."
     
-    command = command.lower()
-    creativity = conversation_engine.creativity_level
-    
     # Open applications
     if "open" in command:
-        if "notepad" in command:
-            if platform.system() == "Windows":
-                subprocess.Popen(["notepad.exe"])
-                if creativity > 0.7:
-                    return "Notepad is now ready for your brilliant thoughts! Time to write something amazing!"
-                elif creativity > 0.3:
-                    return "Opening Notepad for you..."
-                else:
-                    return "Opening Notepad..."
-            else:
-                subprocess.Popen(["gedit"])
-                return "Opening text editor..." if creativity <= 0.3 else "Text editor at your service!"
-                
-        elif "calculator" in command:
-            if platform.system() == "Windows":
-                subprocess.Popen(["calc.exe"])
-                if creativity > 0.7:
-                    return "Calculator is ready to crunch some numbers! Let's solve the mysteries of mathematics!"
-                elif creativity > 0.3:
-                    return "Opening Calculator for you..."
-                else:
-                    return "Opening Calculator..."
-            else:
-                subprocess.Popen(["gnome-calculator"])
-                return "Opening Calculator..." if creativity <= 0.3 else "Calculator ready for action!"
-                
-        elif "browser" in command or "chrome" in command:
-            webbrowser.open("https://www.google.com")
-            if creativity > 0.7:
-                return "Your digital gateway to the internet is now open! Happy browsing, explorer!"
-            elif creativity > 0.3:
-                return "Opening your web browser..."
-            else:
-                return "Opening web browser..."
-                
-        elif "file manager" in command or "explorer" in command:
-            if platform.system() == "Windows":
-                subprocess.Popen(["explorer.exe"])
-                response = "Opening File Explorer..."
-            else:
-                subprocess.Popen(["nautilus"])
-                response = "Opening File Manager..."
-            
-            if creativity > 0.7:
-                return f"📁 {response.replace('...', '')} Time to organize those digital treasures!"
-            elif creativity > 0.3:
-                return f"📁 {response}"
-            else:
-                return response
+        for triggers, handler in _OPEN_APP_HANDLERS:
+            if any(trigger in command for trigger in triggers):
+                return handler(creativity)
     
     # Enhanced volume control (Windows only for now)
-    elif "volume" in command and platform.system() == "Windows":
+    elif "volume" in command and _IS_WINDOWS:
         if "up" in command:
-            subprocess.run(["powershell", "-c", "(New-Object -comObject WScript.Shell).SendKeys([char]175)"])
+            _tap_keys(_VK_VOLUME_UP)
             if creativity > 0.7:
                 return "🔊 Volume boosted! Hope your ears are ready for this!"
             elif creativity > 0.3:
@@ -940,7 +1596,7 @@ def execute_system_command(command):
             else:
                 return "Volume increased."
         elif "down" in command:
-            subprocess.run(["powershell", "-c", "(New-Object -comObject WScript.Shell).SendKeys([char]174)"])
+            _tap_keys(_VK_VOLUME_DOWN)
             if creativity > 0.7:
                 return "🔉 Toned it down a notch! Your neighbors will thank you."
             elif creativity > 0.3:
@@ -948,7 +1604,7 @@ def execute_system_command(command):
             else:
                 return "Volume decreased."
         elif "mute" in command:
-            subprocess.run(["powershell", "-c", "(New-Object -comObject WScript.Shell).SendKeys([char]173)"])
+            _tap_keys(_VK_VOLUME_MUTE)
             if creativity > 0.7:
                 return "🔇 Silence is golden! Volume has been muted/unmuted."
             elif creativity > 0.3:
@@ -959,8 +1615,9 @@ def execute_system_command(command):
     # Enhanced screenshot
     elif "screenshot" in command:
         try:
-            if platform.system() == "Windows":
-                subprocess.run(["powershell", "-c", "Add-Type -AssemblyName System.Windows.Forms; [System.Windows.Forms.SendKeys]::SendWait('%{PRTSC}')"])
+            if _IS_WINDOWS:
+                # Alt+PrintScreen: active window to clipboard
+                _tap_keys(_VK_MENU, _VK_SNAPSHOT)
                 if creativity > 0.7:
                     return "📸 Say cheese! Screenshot captured and saved to your clipboard. Picture perfect!"
                 elif creativity > 0.3:
@@ -968,6 +1625,7 @@ def execute_system_command(command):
                 else:
                     return "Screenshot taken and saved to clipboard."
             else:
+                import subprocess
                 subprocess.run(["gnome-screenshot", "-f", "screenshot.png"])
                 if creativity > 0.7:
                     return "📸 Snapshot saved as screenshot.png! Another moment preserved in digital amber!"
@@ -981,43 +1639,137 @@ def execute_system_command(command):
     
     return None
 
-def call_ai_api(message, enable_search=None, enable_system_commands=None, search_results_limit=None, model_id=None):
-    """Enhanced main AI API function with model selection support"""
-    
-    # Apply response delay from advanced settings
+# Model identification ("what model are you") and identity ("who are you") questions;
+# these show model info rather than triggering a web search
+_MODEL_QUESTIONS = (
+    "what model are you", "which model are you", "what ai model", "which ai model",
+    "what model do you use", "which model do you use", "what are you using",
+    "tell me your model", "identify your model", "current model",
+)
+_IDENTITY_QUESTIONS = (
+    "who are you", "what are you", "tell me about yourself", "introduce yourself",
+    "who is luna", "what is luna",
+)
+_MODEL_QUESTION_RE = re.compile("|".join(map(re.escape, _MODEL_QUESTIONS + _IDENTITY_QUESTIONS)))
+
+# Search-intent detection, compiled once. Prefix keywords are listed in priority order
+# and their trailing text becomes the search query.
+_QUERY_PREFIX_KEYWORDS = (
+    "search", "look up", "find", "google", "what is", "who is", "when is", "where is",
+    "tell me about", "information about",
+)
+_SEARCH_KEYWORDS = _QUERY_PREFIX_KEYWORDS + (
+    "find out", "lookup",
+    "nfl", "football", "sports", "baseball", "basketball", "soccer", "hockey",
+    "news", "latest", "recent", "current", "today", "update", "score", "game",
+    "how to", "tutorial", "guide", "learn", "explain", "define", "meaning of",
+)
+_SEARCH_KEYWORD_RE = re.compile("|".join(map(re.escape, _SEARCH_KEYWORDS)))
+_QUESTION_RE = re.compile("|".join((
+    r"what.+(?:is|are|was|were|will be|does|do|did)",
+    r"who.+(?:is|are|was|were|will be)",
+    r"when.+(?:is|are|was|were|will be|did|does|do)",
+    r"where.+(?:is|are|was|were|will be)",
+    r"how.+(?:is|are|was|were|will be|do|does|did|to)",
+    r"why.+(?:is|are|was|were|will be|do|does|did)",
+    r"(?:nfl|football|sports|baseball|basketball).+(?:score|game|news|update|today|latest)",
+)), re.IGNORECASE)
+_SPORTS_RE = re.compile(r"nfl|football|baseball|basketball|soccer|hockey|sports")
+
+# blake2b(model_id, message) -> (monotonic timestamp, response) for exact repeats of a
+# prompt. Sampling isn't deterministic (temperature 0.7), so this is opt-in through the
+# 'response_cache' setting.
+_RESPONSE_CACHE: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+_RESPONSE_CACHE_MAX = 512
+_RESPONSE_CACHE_TTL = 600.0
+_RESPONSE_CACHE_LOCK = threading.Lock()
+
+def _response_cache_key(model_id: str, message: str) -> str:
+    return hashlib.blake2b(f"{model_id}\x00{message}".encode(), digest_size=16).hexdigest()
+
+def _cached_response(key: str) -> Optional[str]:
+    with _RESPONSE_CACHE_LOCK:
+        entry = _RESPONSE_CACHE.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[0] >= _RESPONSE_CACHE_TTL:
+            del _RESPONSE_CACHE[key]
+            return None
+        _RESPONSE_CACHE.move_to_end(key)
+        return entry[1]
+
+def _cache_response(key: str, response: str):
+    with _RESPONSE_CACHE_LOCK:
+        _RESPONSE_CACHE[key] = (time.monotonic(), response)
+        _RESPONSE_CACHE.move_to_end(key)
+        while len(_RESPONSE_CACHE) > _RESPONSE_CACHE_MAX:
+            _RESPONSE_CACHE.popitem(last=False)
+
+@lru_cache(maxsize=64)
+def _banner(model_name: str, note: Optional[str] = None) -> str:
+    """The '[Using: ...]' trailer appended to replies, built once per model/note"""
+    if note:
+        return f"\n\n[Using: {model_name} ({note})]"
+    return f"\n\n[Using: {model_name}]"
+
+# Error text meaning the model is parked or spinning up, so an alternate is worth trying
+_PAUSE_TOKENS = ("paused", "loading", "warming")
+
+def _stream_response(model_id: str, message: str, on_chunk) -> Tuple[str, Optional[str]]:
+    """Stream a reply to on_chunk and return (text, error).
+
+    error is None when the stream completed; errors before the first chunk propagate."""
+    parts = []
+    try:
+        for delta in openrouter_api.stream_model(model_id, message):
+            parts.append(delta)
+            on_chunk(delta)
+    except Exception as e:
+        if not parts:
+            raise
+        # The caller already has part of the answer; keep it rather than switching models mid-reply
+        print(f"OpenRouter stream from {model_id} ended early: {e}")
+        return "".join(parts), f"stream ended early: {e}"
+    return "".join(parts), None
+
+def call_ai_api(message, enable_search=None, enable_system_commands=None, search_results_limit=None, model_id=None, on_chunk=None):
+    """Enhanced main AI API function with model selection support.
+
+    If on_chunk is given, an OpenRouter reply from the selected model is streamed to it
+    piece by piece; the full reply is still returned."""
+    # The response delay from advanced settings is a minimum response time: it
+    # overlaps with the model/network work instead of being added in front of it
     delay = advanced_settings.get('response_delay', 0.1)
-    if delay > 0:
-        time.sleep(delay)
-    
+    started = time.monotonic()
+    try:
+        return _call_ai_api(message, enable_search, enable_system_commands, search_results_limit, model_id, on_chunk)
+    finally:
+        remaining = delay - (time.monotonic() - started)
+        if remaining > 0:
+            time.sleep(remaining)
+
+def _call_ai_api(message, enable_search=None, enable_system_commands=None, search_results_limit=None, model_id=None, on_chunk=None):
+    """Route a message to the weather/search/system handlers or the active model"""
     # Use passed parameters or fall back to global settings
     search_enabled = enable_search if enable_search is not None else advanced_settings.get('enable_search', True)
     system_enabled = enable_system_commands if enable_system_commands is not None else advanced_settings.get('enable_system_commands', True)
     search_limit = search_results_limit or advanced_settings.get('search_results_limit', 3)
     current_model = model_id or advanced_settings.get('current_model', 'local_engine')
     
-    print(f"[DEBUG] Current model from advanced_settings: {current_model}")
+    if _DEBUG:
+        print(f"[DEBUG] Current model from advanced_settings: {current_model}")
     
     original_message = message
     message_lower = message.lower().strip()
     
-    # Handle direct model identification questions and personal identity questions
-    model_questions = [
-        "what model are you", "which model are you", "what ai model", "which ai model",
-        "what model do you use", "which model do you use", "what are you using",
-        "tell me your model", "identify your model", "current model"
-    ]
-    
-    # Handle "who are you" type questions - these should show model info, not web search
-    identity_questions = [
-        "who are you", "what are you", "tell me about yourself", "introduce yourself",
-        "who is luna", "what is luna"
-    ]
+    # Resolve the active model once; every response is tagged with its name
+    available_models = get_available_models()
+    current_model_info = available_models.get(current_model, available_models['local_engine'])
+    model_name = current_model_info['name']
+    model_suffix = _banner(model_name)
     
-    if any(question in message_lower for question in model_questions) or any(question in message_lower for question in identity_questions):
-        # Get current model info
-        available_models = get_available_models()
-        current_model_info = available_models.get(current_model, available_models['local_engine'])
-        model_name = current_model_info['name']
+    # Handle direct model identification questions and personal identity questions
+    if _MODEL_QUESTION_RE.search(message_lower):
         model_type = current_model_info.get('type', 'unknown')
         description = current_model_info.get('description', 'No description available')
         
@@ -1026,7 +1778,7 @@ def call_ai_api(message, enable_search=None, enable_system_commands=None, search
         else:
             response = f"I am currently using {model_name}, which is a {model_type} model. {description}"
         
-        return f"{response}\n\n[Using: {model_name}]"
+        return response + model_suffix
     
     # Handle weather requests
     if "weather" in message_lower:
@@ -1036,59 +1788,25 @@ def call_ai_api(message, enable_search=None, enable_system_commands=None, search
             if city_part:
                 city = city_part.replace(" ", ",")
         weather_response = get_weather(city)
-        # Get model info for identification
-        available_models = get_available_models()
-        current_model_info = available_models.get(current_model, available_models['local_engine'])
-        model_name = current_model_info['name']
-        return f"{weather_response}\n\n[Using: {model_name}]"
+        return weather_response + model_suffix
     
     # Enhanced web search detection with advanced settings check
     if search_enabled:
-        search_keywords = [
-            "search", "look up", "find", "google", "what is", "who is", "when is", "where is", 
-            "tell me about", "information about", "search for", "find out", "lookup",
-            "nfl", "football", "sports", "baseball", "basketball", "soccer", "hockey",
-            "news", "latest", "recent", "current", "today", "update", "score", "game",
-            "how to", "tutorial", "guide", "learn", "explain", "define", "meaning of"
-        ]
-        
-        # Check if message contains search keywords
-        is_search_query = False
+        # Check if message contains search keywords or looks like a question
+        is_search_query = bool(_SEARCH_KEYWORD_RE.search(message_lower) or _QUESTION_RE.search(message_lower))
         search_query = message_lower
         
-        for keyword in search_keywords:
-            if keyword in message_lower:
-                is_search_query = True
-                if keyword in ["search for", "search", "look up", "find", "google"]:
-                    parts = message_lower.split(keyword, 1)
-                    if len(parts) > 1 and parts[1].strip():
-                        search_query = parts[1].strip()
-                elif keyword in ["what is", "who is", "when is", "where is", "tell me about", "information about"]:
-                    parts = message_lower.split(keyword, 1)
-                    if len(parts) > 1 and parts[1].strip():
-                        search_query = parts[1].strip()
-                break
-        
-        # Enhanced question patterns detection
-        question_patterns = [
-            r"what.+(?:is|are|was|were|will be|does|do|did)",
-            r"who.+(?:is|are|was|were|will be)",
-            r"when.+(?:is|are|was|were|will be|did|does|do)",
-            r"where.+(?:is|are|was|were|will be)",
-            r"how.+(?:is|are|was|were|will be|do|does|did|to)",
-            r"why.+(?:is|are|was|were|will be|do|does|did)",
-            r"(?:nfl|football|sports|baseball|basketball).+(?:score|game|news|update|today|latest)"
-        ]
-        
-        for pattern in question_patterns:
-            if re.search(pattern, message_lower, re.IGNORECASE):
-                is_search_query = True
+        # Text after the first query-prefix keyword (in priority order) becomes the query
+        for keyword in _QUERY_PREFIX_KEYWORDS:
+            idx = message_lower.find(keyword)
+            if idx != -1:
+                rest = message_lower[idx + len(keyword):].strip()
+                if rest:
+                    search_query = rest
                 break
         
         # Special handling for sports queries
-        sports_terms = ["nfl", "football", "baseball", "basketball", "soccer", "hockey", "sports"]
-        if any(term in message_lower for term in sports_terms):
-            is_search_query = True
+        if _SPORTS_RE.search(message_lower):
             if "search the nfl" in message_lower:
                 search_query = "NFL news today latest scores"
             elif "nfl" in message_lower and not any(word in message_lower for word in ["score", "news", "game", "today"]):
@@ -1100,33 +1818,21 @@ def call_ai_api(message, enable_search=None, enable_system_commands=None, search
             if search_query and len(search_query) > 2:
                 print(f"Performing web search for: {search_query}")
                 search_response = enhanced_web_search(search_query, search_limit)
-                # Get model info for identification
-                available_models = get_available_models()
-                current_model_info = available_models.get(current_model, available_models['local_engine'])
-                model_name = current_model_info['name']
-                return f"{search_response}\n\n[Using: {model_name}]"
+                return search_response + model_suffix
     else:
         # Search disabled message
         search_disabled_keywords = ["search", "google", "find", "look up"]
         if any(keyword in message_lower for keyword in search_disabled_keywords):
-            # Get model info for identification
-            available_models = get_available_models()
-            current_model_info = available_models.get(current_model, available_models['local_engine'])
-            model_name = current_model_info['name']
             if conversation_engine.creativity_level > 0.7:
-                return f"Web search is currently taking a digital vacation! You can re-enable it in the advanced settings if you'd like to explore the internet together.\n\n[Using: {model_name}]"
+                return "Web search is currently taking a digital vacation! You can re-enable it in the advanced settings if you'd like to explore the internet together." + model_suffix
             else:
-                return f"Web search is currently disabled. You can enable it in the advanced settings.\n\n[Using: {model_name}]"
+                return "Web search is currently disabled. You can enable it in the advanced settings." + model_suffix
     
     # Handle system commands with advanced settings check
     if system_enabled:
         system_result = execute_system_command(message_lower)
         if system_result:
-            # Get model info for identification
-            available_models = get_available_models()
-            current_model_info = available_models.get(current_model, available_models['local_engine'])
-            model_name = current_model_info['name']
-            return f"{system_result}\n\n[Using: {model_name}]"
+            return system_result + model_suffix
     else:
         # If system commands are disabled but the user clearly asked for one,
         # return an explicit disabled message instead of doing nothing.
@@ -1135,24 +1841,17 @@ def call_ai_api(message, enable_search=None, enable_system_commands=None, search
             "browser", "chrome", "explorer", "file manager"
         ]
         if any(term in message_lower for term in system_disabled_keywords):
-            available_models = get_available_models()
-            current_model_info = available_models.get(current_model, available_models['local_engine'])
-            model_name = current_model_info['name']
             if conversation_engine.creativity_level > 0.7:
                 msg = "System commands are currently disabled for safety. You can re-enable them in the advanced settings if you want me to control apps or volume."
             else:
                 msg = "System commands are disabled. You can enable them in the advanced settings."
-            return f"{msg}\n\n[Using: {model_name}]"
-    
-    # Get current model info for identification
-    available_models = get_available_models()
-    current_model_info = available_models.get(current_model, available_models['local_engine'])
-    model_name = current_model_info['name']
+            return msg + model_suffix
     
     # Try to get response from the active model
     try:
         if current_model_info.get('type') == 'openrouter':
-            # Use OpenRouter model with configurable retry attempts
+            # Configurable attempts; transient retries (429/5xx/timeouts) happen in the HTTP
+            # adapter with exponential backoff, honouring Retry-After
             attempts = 2  # default: initial try + one retry for transient failures
             try:
                 if settings_manager is not None:
@@ -1162,22 +1861,45 @@ def call_ai_api(message, enable_search=None, enable_system_commands=None, search
                         attempts = cfg_attempts
             except Exception:
                 pass
+            try:
+                _configure_openrouter_retries(attempts - 1)
+            except Exception as e:
+                print(f"Could not configure OpenRouter retries: {e}")
             did_reload_token = False
             last_err = None
+            breaker = _breaker_for(current_model)
+
+            cache_key = None
+            try:
+                if settings_manager is not None and settings_manager.get('response_cache', False):
+                    cache_key = _response_cache_key(current_model, original_message)
+            except Exception:
+                pass
+            if cache_key is not None:
+                cached = _cached_response(cache_key)
+                if cached is not None:
+                    return cached + model_suffix
             
             # Determine which API to use based on provider
-            available_models = get_available_models()
             model_info = available_models.get(current_model, {})
             provider = model_info.get('provider', 'openrouter')
             
-            for attempt in range(attempts):
+            # Loops again only after a one-time auth token reload
+            while True:
+                if not breaker.allow():
+                    # Model has been failing repeatedly: skip straight to alternates/local fallback
+                    last_err = last_err or breaker.last_error or "model temporarily disabled after repeated failures"
+                    print(f"Skipping {current_model}: circuit open after repeated failures")
+                    break
                 try:
-                    if attempt > 0:
-                        time.sleep(2 * attempt)
-                    print(f"Using {current_model} for response... (attempt {attempt+1}/{attempts})")
+                    print(f"Using {current_model} for response...")
                     
                     # Route to appropriate API based on provider
-                    if provider == 'openrouter':
+                    stream_err = None
+                    if on_chunk is not None:
+                        # Only the selected model streams; alternates below are fetched whole
+                        response, stream_err = _stream_response(current_model, original_message, on_chunk)
+                    elif provider == 'openrouter':
                         response = openrouter_api.query_model(current_model, original_message)
                     else:  # Default to OpenRouter
                         response = openrouter_api.query_model(current_model, original_message)
@@ -1188,10 +1910,22 @@ def call_ai_api(message, enable_search=None, enable_system_commands=None, search
                     if not str(response).strip():
                         raise Exception("Empty response from OpenRouter model")
 
+                    if stream_err is not None:
+                        # A cut-off reply is still shown, but it is not a success: don't
+                        # cache it, and let it count against the model
+                        breaker.record_failure(stream_err)
+                        try:
+                            settings_manager.set_model_error(current_model, stream_err)
+                        except Exception:
+                            pass
+                        return str(response) + model_suffix
+                    breaker.record_success()
                     # Clear any previous errors if successful
                     if settings_manager is not None:
                         settings_manager.clear_model_error(current_model)
-                    return f"{response}\n\n[Using: {model_name}]"
+                    if cache_key is not None:
+                        _cache_response(cache_key, str(response))
+                    return str(response) + model_suffix
                 except Exception as e:
                     last_err = str(e)
                     print(f"OpenRouter API Error: {last_err}")
@@ -1200,29 +1934,29 @@ def call_ai_api(message, enable_search=None, enable_system_commands=None, search
                         settings_manager.set_model_error(current_model, last_err)
                     except Exception:
                         pass
-                    lower = last_err.lower()
-                    # One-time auth recovery: try reloading token from .env on 401/403/auth errors
-                    auth_error = ("authentication" in lower) or ("authorization" in lower) or ("401" in lower) or ("403" in lower)
-                    if auth_error and not did_reload_token:
-                        try:
-                            if reload_openrouter_token_from_env():
-                                did_reload_token = True
-                                print("Reloaded OpenRouter token from .env after auth error; retrying...")
-                                continue
-                        except Exception:
-                            pass
-                    transient = ("paused" in lower) or ("loading" in lower) or ("rate limit" in lower) or ("429" in lower)
-                    # If not transient or no more retries, break to fallback
-                    if not transient:
+                    if isinstance(e, AuthError):
+                        # One-time auth recovery: try reloading token from .env. Auth problems
+                        # are not the model's fault, so they don't count against its breaker
+                        if not did_reload_token:
+                            try:
+                                if reload_openrouter_token_from_env():
+                                    did_reload_token = True
+                                    print("Reloaded OpenRouter token from .env after auth error; retrying...")
+                                    continue
+                            except Exception:
+                                pass
                         break
-                    # Otherwise loop for retry (if attempts remain)
-                    continue
+                    # Transient failures were already retried by the transport; go to fallback
+                    breaker.record_failure(last_err)
+                    break
+            # First line of the error, shared by the alternate and local fallback messages
+            err_summary = last_err.partition('\n')[0] if last_err else None
             # Before local fallback, attempt alternate OpenRouter models based on advanced recovery settings
             try:
-                lower = (last_err or "").lower()
                 auto_fb = True
                 cap = 3
                 ignore_pings = False
+                race = False
                 priority_raw = ""
                 try:
                     def _to_bool(v, default=False):
@@ -1244,210 +1978,181 @@ def call_ai_api(message, enable_search=None, enable_system_commands=None, search
                         cap = int(settings_manager.get('alt_attempt_cap', 3))
                         ignore_pings = _to_bool(settings_manager.get('ignore_status_pings', False), False)
                         priority_raw = settings_manager.get('alternate_priority', '') or ''
+                        race = _to_bool(settings_manager.get('speculative_fallback', False), False)
                 except Exception:
                     pass
 
                 # Decide if we proceed to alternates
-                proceed_to_alts = ("paused" in lower) or ("loading" in lower)
-                if ignore_pings:
-                    proceed_to_alts = True
+                proceed_to_alts = ignore_pings
+                if not proceed_to_alts and last_err:
+                    lower = last_err.lower()
+                    proceed_to_alts = any(tok in lower for tok in _PAUSE_TOKENS)
 
                 if auto_fb and cap > 0 and proceed_to_alts:
-                    alt_models = []
-                    try:
-                        # Build list of other OpenRouter models defined in the same set the UI shows
-                        ui_models = _get_ui_available_models()
-                        for mid, info in ui_models.items():
-                            # Only include OpenRouter type models for OR API fallback
-                            if mid != current_model and info.get('type') == 'openrouter' and info.get('provider') == 'openrouter':
-                                alt_models.append((mid, info))
-                        # Apply priority ordering if provided
-                        priority = [p.strip() for p in priority_raw.split(',') if p.strip()]
-                        if priority:
-                            pr_index = {mid: i for i, mid in enumerate(priority)}
-                            alt_models.sort(key=lambda t: pr_index.get(t[0], len(priority)))
-                    except Exception:
-                        pass
+                    # Parse the priority list once for both alternate passes
+                    priority = [p.strip() for p in priority_raw.split(',') if p.strip()]
+                    pr_index = {}
+                    for i, mid in enumerate(priority):
+                        pr_index.setdefault(mid, i)
+                    pr_miss = len(priority)
+                    # Other OpenRouter models from the same set the UI shows (cached; read-only)
+                    alt_info = _openrouter_alts(current_model, _UI_MODELS_VERSION)
+                    alt_ids = list(alt_info)
+                    # Drop models OpenRouter no longer lists instead of discovering each 404 with a
+                    # full completion request; ids with their own endpoint override are kept
+                    live = _live_openrouter_models()
+                    if live is not None:
+                        alt_ids = [mid for mid in alt_ids if mid in live or _endpoint_for(mid)]
+                    # Apply priority ordering if provided
+                    if priority:
+                        alt_ids.sort(key=lambda mid: pr_index.get(mid, pr_miss))
 
-                    tried = 0
-                    for (alt_id, alt_info) in alt_models:
-                        if tried >= cap:
-                            break
-                        try:
-                            err_summary = (last_err.splitlines()[0] if last_err else 'unknown')
-                            print(f"Trying alternate HF model '{alt_id}' due to error: {err_summary}")
-                            alt_resp = hf_api.query_model(alt_id, original_message)
-                            # Success: auto-switch for continuity
-                            try:
-                                if settings_manager is not None:
-                                    settings_manager.set('current_ai_model', alt_id)
-                                update_advanced_settings({'current_model': alt_id})
-                            except Exception:
-                                pass
-                            alt_name = alt_info.get('name', alt_id)
-                            return f"{alt_resp}\n\n[Using: {alt_name} (Auto-switched)]"
-                        except HFRequestError as alt_e:
-                            # 404 means the model isn't available via Inference API; skip without consuming an attempt
-                            if getattr(alt_e, 'status_code', None) == 404:
-                                print(f"Skipping alternate '{alt_id}' (404 Inference API not available): {alt_e}")
-                                continue
-                            print(f"Alternate HF model failed: {alt_e}")
-                            tried += 1
-                            continue
-                        except Exception as alt_e:
-                            print(f"Alternate HF model failed (unknown): {alt_e}")
-                            tried += 1
-                            continue
+                    print(f"Trying alternate OpenRouter models due to error: {err_summary or 'unknown'}")
+                    hit, tried, attempted = _try_alternates(alt_ids, original_message, cap, race=race)
 
                     # If we haven't reached the cap, try UI/ENV candidates directly to fill remaining attempts
-                    if tried < cap:
-                        direct_list = []
-                        # Start with ENV, but only include those present in the UI-available set
-                        env_alts = _get_env_alt_models()
-                        ui_models = _get_ui_available_models()
-                        if env_alts:
-                            for alt in env_alts:
-                                if alt != current_model and alt in ui_models and ui_models[alt].get('type') == 'openrouter' and ui_models[alt].get('provider') == 'openrouter':
-                                    direct_list.append(alt)
-                        # If still empty, use other UI-declared HF models (excluding current)
-                        if not direct_list:
-                            direct_list = [mid for mid, info in ui_models.items() 
-                                        if mid != current_model 
-                                        and info.get('type') == 'openrouter' 
-                                        and info.get('provider') == 'openrouter']
+                    if hit is None and tried < cap:
+                        # Start with ENV, but only include those present in the UI-available set;
+                        # if none are, use the other UI-declared OpenRouter models
+                        eligible = set(alt_ids)
+                        candidates = [alt for alt in _get_env_alt_models() if alt in eligible] or alt_ids
+                        # Don't ask the same models twice
+                        seen = set(attempted)
+                        direct_list = [mid for mid in candidates if mid not in seen]
                         # Apply priority ordering if provided
-                        priority = [p.strip() for p in priority_raw.split(',') if p.strip()]
                         if priority:
-                            direct_list.sort(key=lambda mid: priority.index(mid) if mid in priority else len(priority))
-                        for alt_id in direct_list:
-                            if alt_id == current_model or tried >= cap:
-                                continue
-                            try:
-                                print(f"Trying alternate OpenRouter model '{alt_id}' (direct)...")
-                                alt_resp = openrouter_api.query_model(alt_id, original_message)
-                                # Success: auto-switch for continuity
-                                try:
-                                    if settings_manager is not None:
-                                        settings_manager.set('current_ai_model', alt_id)
-                                    update_advanced_settings({'current_model': alt_id})
-                                except Exception:
-                                    pass
-                                alt_name = ui_models.get(alt_id, {}).get('name', alt_id)
-                                return f"{alt_resp}\n\n[Using: {alt_name} (Auto-switched)]"
-                            except OpenRouterRequestError as alt_e:
-                                if getattr(alt_e, 'status_code', None) == 404:
-                                    print(f"Skipping alternate '{alt_id}' (404 Inference API not available): {alt_e}")
-                                    continue
-                                print(f"Alternate OpenRouter model failed (direct): {alt_e}")
-                                tried += 1
-                                continue
-                            except Exception as alt_e:
-                                print(f"Alternate OpenRouter model failed (direct, unknown): {alt_e}")
-                                tried += 1
-                                continue
-
+                            direct_list.sort(key=lambda mid: pr_index.get(mid, pr_miss))
+                        hit, tried, _ = _try_alternates(direct_list, original_message, cap, tried, race=race)
                         # Note: No curated alternates; alternates strictly follow the UI list to keep backend and UI in sync.
+
+                    if hit is not None:
+                        # Success: auto-switch for continuity. Every candidate came from alt_info.
+                        alt_id, alt_resp = hit
+                        _switch_to_alternate(alt_id)
+                        alt_name = alt_info[alt_id].get('name', alt_id)
+                        return f"{alt_resp}{_banner(alt_name, 'Auto-switched')}"
             except Exception:
                 pass
 
             # Fallback to local model with error context
             print(f"Falling back to local conversation engine...")
-            fallback_msg = "OpenRouter model error: " + (last_err.split('\n')[0] if last_err else 'unknown error')
+            fallback_msg = "OpenRouter model error: " + (err_summary or 'unknown error')
             fallback_response = conversation_engine.generate_response(
                 f"[SYSTEM: {fallback_msg}] {original_message}"
             )
-            return f"{fallback_response}\n\n[Using: Local Conversation Engine (Fallback)]"
+            return fallback_response + _banner("Local Conversation Engine", "Fallback")
         else:  # Local model
             response = conversation_engine.generate_response(original_message)
             # Clear any previous errors for local engine
             if settings_manager is not None:
                 settings_manager.clear_model_error(current_model)
-            return f"{response}\n\n[Using: {model_name}]"
+            return response + model_suffix
     except Exception as e:
         print(f"Unexpected error in call_ai_api: {e}")
         # Fallback response when all else fails
-        return f"I'm having trouble connecting to any AI models right now. Please try again later.\n\n[Using: {model_name}]"
+        return "I'm having trouble connecting to any AI models right now. Please try again later." + model_suffix
 
-def get_available_models():
-    """Return a dictionary of available AI models and their configurations."""
+# Static model table; callers treat it as read-only
+_AVAILABLE_MODELS = {
+    # Local Engine
+    "local_engine": {
+        "name": "Local Conversation Engine",
+        "type": "local",
+        "provider": "local",
+        "description": "Fast local responses with advanced pattern matching and creativity controls",
+        "features": ["instant_response", "offline", "privacy", "creativity_control", "weather_integration", "web_search", "system_commands"],
+        "status": "active"
+    },
+    "local/mistral-7b-instruct": {
+        "name": "Mistral 7B",
+        "type": "local",
+        "provider": "local",
+        "description": "Local 7B parameter model with excellent performance, runs entirely on your hardware",
+        "features": ["conversation", "reasoning", "instruction_following", "code_generation", "offline", "privacy"],
+        "status": "not_downloaded",
+        "download_command": "ollama pull mistral"
+    },
+    "local/llama-3.1-8b-instruct": {
+        "name": "Llama 3.1 8B",
+        "type": "local",
+        "provider": "local",
+        "description": "Latest local 8B model with strong reasoning capabilities, runs entirely on your hardware",
+        "features": ["reasoning", "conversation", "instruction_following", "knowledge_retrieval", "offline", "privacy"],
+        "status": "not_downloaded",
+        "download_command": "ollama pull llama3.1"
+    },
+    "local/qwen-2.5-7b-instruct": {
+        "name": "Qwen 2.5 7B",
+        "type": "local",
+        "provider": "local",
+        "description": "Local 7B model with strong multilingual capabilities, runs entirely on your hardware",
+        "features": ["multilingual", "conversation", "reasoning", "instruction_following", "offline", "privacy"],
+        "status": "not_downloaded",
+        "download_command": "ollama pull qwen2.5:7b"
+    },
+    "local/deepseek-coder-6.7b": {
+        "name": "DeepSeek Coder 6.7B",
+        "type": "local",
+        "provider": "local",
+        "description": "Local 6.7B model optimized for coding and programming tasks, runs entirely on your hardware",
+        "features": ["code_generation", "programming_assistance", "debugging", "offline", "privacy"],
+        "status": "not_downloaded",
+        "download_command": "ollama pull deepseek-coder:6.7b"
+    },
     
-    # Check API keys
-    hf_token = os.getenv('HF_API_TOKEN')
-    or_key = os.getenv('OPENROUTER_API_KEY')
-    
-    return {
-        # Local Engine
-        "local_engine": {
-            "name": "Local Conversation Engine",
-            "type": "local",
-            "provider": "local",
-            "description": "Fast local responses with advanced pattern matching and creativity controls",
-            "features": ["instant_response", "offline", "privacy", "creativity_control", "weather_integration", "web_search", "system_commands"],
-            "status": "active"
-        },
-        "local/mistral-7b-instruct": {
-            "name": "Mistral 7B",
-            "type": "local",
-            "provider": "local",
-            "description": "Local 7B parameter model with excellent performance, runs entirely on your hardware",
-            "features": ["conversation", "reasoning", "instruction_following", "code_generation", "offline", "privacy"],
-            "status": "not_downloaded",
-            "download_command": "ollama pull mistral"
-        },
-        "local/llama-3.1-8b-instruct": {
-            "name": "Llama 3.1 8B",
-            "type": "local",
-            "provider": "local",
-            "description": "Latest local 8B model with strong reasoning capabilities, runs entirely on your hardware",
-            "features": ["reasoning", "conversation", "instruction_following", "knowledge_retrieval", "offline", "privacy"],
-            "status": "not_downloaded",
-            "download_command": "ollama pull llama3.1"
-        },
-        "local/qwen-2.5-7b-instruct": {
-            "name": "Qwen 2.5 7B",
-            "type": "local",
-            "provider": "local",
-            "description": "Local 7B model with strong multilingual capabilities, runs entirely on your hardware",
-            "features": ["multilingual", "conversation", "reasoning", "instruction_following", "offline", "privacy"],
-            "status": "not_downloaded",
-            "download_command": "ollama pull qwen2.5:7b"
-        },
-        "local/deepseek-coder-6.7b": {
-            "name": "DeepSeek Coder 6.7B",
-            "type": "local",
-            "provider": "local",
-            "description": "Local 6.7B model optimized for coding and programming tasks, runs entirely on your hardware",
-            "features": ["code_generation", "programming_assistance", "debugging", "offline", "privacy"],
-            "status": "not_downloaded",
-            "download_command": "ollama pull deepseek-coder:6.7b"
-        },
-        
-        # OpenRouter Free Models
-        "deepseek/deepseek-r1-0528:free": {
-            "name": "DeepSeek R1",
-            "type": "openrouter",
-            "provider": "openrouter",
-            "description": "DeepSeek's latest conversational model optimized for chat interactions and instruction following",
-            "features": ["conversation", "instruction_following", "reasoning", "multilingual"],
-            "status": "available"
-        },
-        "openai/gpt-oss-20b:free": {
-            "name": "OpenAI GPT-OSS 20B",
-            "type": "openrouter",
-            "provider": "openrouter",
-            "description": "Open-source 20B parameter language model based on GPT architecture with strong general-purpose capabilities",
-            "features": ["conversation", "reasoning", "code_generation", "knowledge_retrieval", "multilingual"],
-            "status": "available"
-        },
-        "openai/gpt-oss-120b:free": {
-            "name": "OpenAI GPT-OSS 120B",
-            "type": "openrouter",
-            "provider": "openrouter",
-            "description": "Larger GPT-OSS 120B parameter model for more demanding reasoning and generation tasks",
-            "features": ["conversation", "reasoning", "code_generation", "knowledge_retrieval", "multilingual"],
-            "status": "available"
-        }
+    # OpenRouter Free Models
+    "deepseek/deepseek-r1-0528:free": {
+        "name": "DeepSeek R1",
+        "type": "openrouter",
+        "provider": "openrouter",
+        "description": "DeepSeek's latest conversational model optimized for chat interactions and instruction following",
+        "features": ["conversation", "instruction_following", "reasoning", "multilingual"],
+        "status": "available"
+    },
+    "openai/gpt-oss-20b:free": {
+        "name": "OpenAI GPT-OSS 20B",
+        "type": "openrouter",
+        "provider": "openrouter",
+        "description": "Open-source 20B parameter language model based on GPT architecture with strong general-purpose capabilities",
+        "features": ["conversation", "reasoning", "code_generation", "knowledge_retrieval", "multilingual"],
+        "status": "available"
+    },
+    "openai/gpt-oss-120b:free": {
+        "name": "OpenAI GPT-OSS 120B",
+        "type": "openrouter",
+        "provider": "openrouter",
+        "description": "Larger GPT-OSS 120B parameter model for more demanding reasoning and generation tasks",
+        "features": ["conversation", "reasoning", "code_generation", "knowledge_retrieval", "multilingual"],
+        "status": "available"
     }
+}
+
+def get_available_models():
+    """Return a dictionary of available AI models and their configurations."""
+    return _AVAILABLE_MODELS
+
+# Retired model ids -> their current OpenRouter slugs
+_LEGACY_MODEL_MAP = MappingProxyType({
+    "deepseek/deepseek-chat-v3-0324:free": "deepseek/deepseek-r1-0528:free",
+    "nex-agi/deepseek-v3.1-nex-n1:free": "deepseek/deepseek-r1-0528:free",
+})
+
+def _norm_alias(s: str) -> str:
+    return ''.join(ch for ch in s.lower() if ch.isalnum())
+
+@lru_cache(maxsize=1)
+def _alias_index() -> Tuple[Dict[str, List[str]], Dict[str, List[str]], Dict[str, int]]:
+    """Normalized id/name -> model keys, normalized id -> model keys, and each key's table position"""
+    names: Dict[str, List[str]] = {}
+    keys: Dict[str, List[str]] = {}
+    order: Dict[str, int] = {}
+    for i, (key, info) in enumerate(_AVAILABLE_MODELS.items()):
+        norm_key = _norm_alias(key)
+        names.setdefault(norm_key, []).append(key)
+        names.setdefault(_norm_alias(info.get('name', key)), []).append(key)
+        keys.setdefault(norm_key, []).append(key)
+        order[key] = i
+    return names, keys, order
 
 def set_current_model(model_id: str):
     """Set the current AI model"""
@@ -1455,42 +2160,38 @@ def set_current_model(model_id: str):
     available_models = get_available_models()
     
     # Normalize some known legacy IDs to current OpenRouter slugs
-    legacy_map = {
-        "deepseek/deepseek-chat-v3-0324:free": "deepseek/deepseek-r1-0528:free",
-        "nex-agi/deepseek-v3.1-nex-n1:free": "deepseek/deepseek-r1-0528:free",
-    }
-    if model_id in legacy_map:
-        model_id = legacy_map[model_id]
+    model_id = _LEGACY_MODEL_MAP.get(model_id, model_id)
 
     # Direct match first
     if model_id in available_models:
         advanced_settings['current_model'] = model_id
         print(f"[OK] Current AI model set to {available_models[model_id]['name']}")
-        print(f"[DEBUG] Advanced settings current_model is now: {advanced_settings['current_model']}")
+        if _DEBUG:
+            print(f"[DEBUG] Advanced settings current_model is now: {advanced_settings['current_model']}")
         return True
     
     # Try to normalize and map friendly/alias IDs to known keys
-    def _norm(s: str) -> str:
-        return ''.join(ch for ch in s.lower() if ch.isalnum())
-    target = _norm(model_id)
-    candidates = []
-    for key, info in available_models.items():
-        norm_key = _norm(key)
-        norm_name = _norm(info.get('name', key))
-        if target == norm_key or target == norm_name or target.endswith(norm_key.split('/')[-1] if '/' in key else norm_key):
-            candidates.append(key)
+    target = _norm_alias(model_id)
+    names, keys, order = _alias_index()
+    # A key matches on its normalized id or name, or when the target ends with the normalized id
+    matched = set(names.get(target, ()))
+    for i in range(len(target)):
+        matched.update(keys.get(target[i:], ()))
+    candidates = sorted(matched, key=order.__getitem__)
     if len(candidates) == 1:
         mapped = candidates[0]
         advanced_settings['current_model'] = mapped
         print(f"[OK] Remapped '{model_id}' to '{mapped}' -> {available_models[mapped]['name']}")
-        print(f"[DEBUG] Advanced settings current_model is now: {advanced_settings['current_model']}")
+        if _DEBUG:
+            print(f"[DEBUG] Advanced settings current_model is now: {advanced_settings['current_model']}")
         return True
     elif len(candidates) > 1:
         print(f"[WARN] Ambiguous model alias '{model_id}'. Candidates: {candidates}. Using first: {candidates[0]}")
         mapped = candidates[0]
         advanced_settings['current_model'] = mapped
         print(f"[OK] Current AI model set to {available_models[mapped]['name']}")
-        print(f"[DEBUG] Advanced settings current_model is now: {advanced_settings['current_model']}")
+        if _DEBUG:
+            print(f"[DEBUG] Advanced settings current_model is now: {advanced_settings['current_model']}")
         return True
     else:
         print(f"Model '{model_id}' not found in available models (no alias match)")
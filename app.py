@@ -1,17 +1,25 @@
 import sys
 import os
+import copy
 import json
+import re
+import threading
 import time
 import uuid
+import weakref
 import psutil
 import platform
+from dataclasses import dataclass, field
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Add the path to find ai_api module
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 import ai_api
 
-from PySide6.QtCore import Qt, QSize, QThread, Signal, QTimer
+from PySide6.QtCore import (
+    Qt, QSize, QThread, Signal, QTimer, QSignalBlocker, QObject, QRunnable, QThreadPool
+)
 from PySide6.QtGui import QPalette, QColor, QFont, QIcon, QTextCursor, QPixmap
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
@@ -23,13 +31,135 @@ from PySide6.QtWidgets import (
 
 from local_model_manager import get_manager as get_local_model_manager
 
+# .env path -> (st_mtime_ns, parsed KEY=value pairs); reused while the file is unchanged
+_ENV_CACHE = {}
+
+def _env_file_path():
+    """Path of the .env shared with ai_api._load_env_from_dotenv"""
+    # When frozen, use the executable directory so .env lives next to LunaAI.exe
+    try:
+        if getattr(sys, "frozen", False) and hasattr(sys, "executable"):
+            base_dir = os.path.dirname(sys.executable)
+        else:
+            base_dir = os.path.dirname(os.path.abspath(__file__))
+    except Exception:
+        base_dir = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(base_dir, '.env')
+
+def _read_env_file(env_path):
+    """Return the KEY=value pairs in env_path ({} if missing), parsing only when it changed"""
+    try:
+        mtime = os.stat(env_path).st_mtime_ns
+    except OSError:
+        _ENV_CACHE.pop(env_path, None)
+        return {}
+    cached = _ENV_CACHE.get(env_path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    values = {}
+    with open(env_path, 'r') as f:
+        for line in f.read().splitlines():
+            key, sep, value = line.strip().partition('=')
+            if sep and not key.startswith('#'):
+                values[key] = value
+    _ENV_CACHE[env_path] = (mtime, values)
+    return values
+
+_ENV_HEADER = (
+    "# Luna AI API Keys Configuration\n"
+    "# This file is automatically generated by the Settings dialog\n\n"
+)
+_ENV_OPENROUTER = (
+    "\n# OpenRouter API Configuration (optional - for premium models)\n"
+    "# Get your API key from: https://openrouter.ai/keys\n"
+    "OPENROUTER_API_KEY={}\n"
+)
+_ENV_OPENWEATHERMAP = (
+    "\n# OpenWeatherMap API Configuration (optional - for weather features)\n"
+    "# Get your API key from: https://openweathermap.org/api\n"
+    "OPENWEATHERMAP_API_KEY={}\n"
+)
+
+def _write_env_file(env_path, or_key, owm_key):
+    """Write the .env body in one go via a temp file so a crash never leaves it truncated"""
+    sections = [_ENV_HEADER]
+    if or_key:
+        sections.append(_ENV_OPENROUTER.format(or_key))
+    if owm_key:
+        sections.append(_ENV_OPENWEATHERMAP.format(owm_key))
+    tmp_path = env_path + ".tmp"
+    with open(tmp_path, 'w') as f:
+        f.writelines(sections)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, env_path)
+
+_TRUE_STRINGS = frozenset(("1", "true", "yes", "on"))
+_FALSE_STRINGS = frozenset(("0", "false", "no", "off"))
+
+def _to_bool(v, default=False):
+    """Coerce truthy/falsey setting values (including strings) to bool"""
+    if v is None:
+        return default
+    if isinstance(v, bool):
+        return v
+    try:
+        s = str(v).strip().lower()
+        if s in _TRUE_STRINGS:
+            return True
+        if s in _FALSE_STRINGS:
+            return False
+    except Exception:
+        pass
+    return bool(v)
+
+_NON_ALNUM_RE = re.compile(r'[\W_]+')
+
+def _norm_model_key(s) -> str:
+    """Lowercased model id/name with everything but letters and digits removed"""
+    return _NON_ALNUM_RE.sub('', str(s).lower())
+
+# Slider position (0-10) -> label text; the slider only has these eleven values
+_CREATIVITY_LABELS = tuple(f"{i / 10:.1f}" for i in range(11))
+
 # Enhanced Settings Dialog with model selection
 class SettingsDialog(QDialog):
+    # One stylesheet for the whole dialog; widgets opt in through their object names
+    STYLE = """
+        QPushButton#danger { background-color: #e53935; color: white; padding: 8px; border-radius: 8px; }
+        QPushButton#primary { background-color: #4CAF50; color: white; padding: 8px; border-radius: 8px; }
+        QPushButton#secondary { background-color: #555; color: white; padding: 8px; border-radius: 8px; }
+        QPushButton#reset { background-color: #f44336; color: white; padding: 8px; border-radius: 8px; }
+        QLabel#hint { color: #888; font-size: 11px; }
+        QLabel#creativityHint { color: #888; font-size: 11px; margin-bottom: 10px; }
+        QLabel#creativityValue { font-weight: bold; color: #4CAF50; }
+        QLabel#apiStatus { color: #888; font-size: 12px; padding: 5px; background-color: #2a2a2a; border-radius: 5px; }
+    """
+    
+    # Widgets each tab fills in _load_tab_settings; their signals are blocked while loading
+    _TAB_WIDGETS = {
+        "general": ("default_city",),
+        "ui": ("font_size", "theme", "auto_scroll", "save_history"),
+        "ai": ("creativity_slider",),
+        "api": ("openrouter_api_key", "openweathermap_api_key"),
+        "advanced": (
+            "search_results_limit", "conversation_memory", "response_delay",
+            "enable_web_search", "enable_system_commands", "auto_fallback",
+            "retry_attempts", "status_check_interval", "alt_attempt_cap",
+            "ignore_status_pings", "speculative_fallback", "alternate_priority",
+        ),
+    }
+    
     def __init__(self, settings_manager, parent=None):
         super().__init__(parent)
         self.settings_manager = settings_manager
         self.setWindowTitle("Luna Settings")
         self.setFixedSize(500, 750)
+        self.setStyleSheet(self.STYLE)
+        # The window refreshed after Save; found once instead of scanning top-level widgets
+        self._main_window_ref = (
+            weakref.ref(parent) if parent is not None and hasattr(parent, 'update_model_status_ui') else None
+        )
         self.setup_ui()
         self.load_current_settings()
     
@@ -49,9 +179,62 @@ class SettingsDialog(QDialog):
         
         tabs.addTab(general_tab, "General")
         
+        # The other tabs are built the first time they are shown; until then their
+        # settings stay as stored (see load_current_settings / save_settings)
+        self._built_tabs = {"general"}
+        self._tab_builders = {}
+        for name, title, builder in (
+            ("ui", "Interface", self._build_ui_tab),
+            ("ai", "AI Response", self._build_ai_tab),
+            ("api", "API Keys", self._build_api_tab),
+            ("advanced", "Advanced", self._build_advanced_tab),
+        ):
+            page = QWidget()
+            self._tab_builders[tabs.addTab(page, title)] = (name, page, builder)
+        tabs.currentChanged.connect(self._ensure_tab_built)
+        
+        layout.addWidget(tabs)
+        
+        # Buttons
+        button_layout = QHBoxLayout()
+        
+        clear_data_btn = QPushButton("Delete Local Data")
+        clear_data_btn.clicked.connect(self.clear_local_memory)
+        clear_data_btn.setObjectName("danger")
+        
+        save_btn = QPushButton("Save")
+        save_btn.clicked.connect(self.save_settings)
+        save_btn.setObjectName("primary")
+        
+        cancel_btn = QPushButton("Cancel")
+        cancel_btn.clicked.connect(self.reject)
+        cancel_btn.setObjectName("secondary")
+        
+        reset_btn = QPushButton("Reset to Defaults")
+        reset_btn.clicked.connect(self.reset_to_defaults)
+        reset_btn.setObjectName("reset")
+        
+        button_layout.addWidget(clear_data_btn)
+        button_layout.addWidget(reset_btn)
+        button_layout.addStretch()
+        button_layout.addWidget(save_btn)
+        button_layout.addWidget(cancel_btn)
+        
+        layout.addLayout(button_layout)
+    
+    def _ensure_tab_built(self, index):
+        """Build a lazily created tab the first time it is shown and load its settings"""
+        entry = self._tab_builders.pop(index, None)
+        if entry is None:
+            return
+        name, page, builder = entry
+        builder(page)
+        self._built_tabs.add(name)
+        self._load_tab_settings(name)
+    
+    def _build_ui_tab(self, page):
         # Interface Settings Tab
-        ui_tab = QWidget()
-        ui_layout = QFormLayout(ui_tab)
+        ui_layout = QFormLayout(page)
         
         self.font_size = QSpinBox()
         self.font_size.setRange(10, 24)
@@ -69,12 +252,10 @@ class SettingsDialog(QDialog):
         self.save_history = QCheckBox()
         self.save_history.setChecked(True)
         ui_layout.addRow("Save Chat History:", self.save_history)
-        
-        tabs.addTab(ui_tab, "Interface")
-        
+    
+    def _build_ai_tab(self, page):
         # AI Response Settings Tab
-        ai_tab = QWidget()
-        ai_layout = QVBoxLayout(ai_tab)
+        ai_layout = QVBoxLayout(page)
         
         # AI Response Creativity section
         creativity_group = QGroupBox("AI Response Creativity")
@@ -88,7 +269,7 @@ class SettingsDialog(QDialog):
             "• High (0.8-1.0): Maximum creativity and response variety"
         )
         creativity_explanation.setWordWrap(True)
-        creativity_explanation.setStyleSheet("color: #888; font-size: 11px; margin-bottom: 10px;")
+        creativity_explanation.setObjectName("creativityHint")
         creativity_layout.addWidget(creativity_explanation)
         
         # Creativity slider
@@ -107,7 +288,7 @@ class SettingsDialog(QDialog):
         
         self.creativity_value_label = QLabel("0.7")
         self.creativity_value_label.setMinimumWidth(30)
-        self.creativity_value_label.setStyleSheet("font-weight: bold; color: #4CAF50;")
+        self.creativity_value_label.setObjectName("creativityValue")
         creativity_slider_layout.addWidget(self.creativity_value_label)
         
         # Connect slider to update label
@@ -116,12 +297,10 @@ class SettingsDialog(QDialog):
         creativity_layout.addLayout(creativity_slider_layout)
         ai_layout.addWidget(creativity_group)
         ai_layout.addStretch()
-        
-        tabs.addTab(ai_tab, "AI Response")
-        
+    
+    def _build_api_tab(self, page):
         # API Keys Settings Tab
-        api_tab = QWidget()
-        api_layout = QVBoxLayout(api_tab)
+        api_layout = QVBoxLayout(page)
         
         # API Keys group
         api_keys_group = QGroupBox("API Keys")
@@ -134,7 +313,7 @@ class SettingsDialog(QDialog):
         api_keys_layout.addRow("OpenRouter API Key:", self.openrouter_api_key)
         
         or_info = QLabel("Get your OpenRouter API key from: https://openrouter.ai/keys")
-        or_info.setStyleSheet("color: #888; font-size: 11px;")
+        or_info.setObjectName("hint")
         or_info.setOpenExternalLinks(True)
         or_info.setTextFormat(Qt.TextFormat.RichText)
         or_info.setText('<a href="https://openrouter.ai/keys" style="color: #4CAF50;">Get OpenRouter API Key</a>')
@@ -147,7 +326,7 @@ class SettingsDialog(QDialog):
         api_keys_layout.addRow("OpenWeatherMap API Key:", self.openweathermap_api_key)
         
         owm_info = QLabel("Get your OpenWeatherMap API key from: https://home.openweathermap.org/api_keys")
-        owm_info.setStyleSheet("color: #888; font-size: 11px;")
+        owm_info.setObjectName("hint")
         owm_info.setOpenExternalLinks(True)
         owm_info.setTextFormat(Qt.TextFormat.RichText)
         owm_info.setText('<a href="https://home.openweathermap.org/api_keys" style="color: #4CAF50;">Get OpenWeatherMap API Key</a>')
@@ -155,24 +334,26 @@ class SettingsDialog(QDialog):
         
         # Status display
         self.api_status_label = QLabel()
-        self.api_status_label.setStyleSheet("color: #888; font-size: 12px; padding: 5px; background-color: #2a2a2a; border-radius: 5px;")
+        self.api_status_label.setObjectName("apiStatus")
         self.api_status_label.setWordWrap(True)
-        self.update_api_status_display()
         api_keys_layout.addRow("", self.api_status_label)
         
-        # Connect text change signals for real-time status updates
-        self.openrouter_api_key.textChanged.connect(self.on_api_key_changed)
-        self.openweathermap_api_key.textChanged.connect(self.on_api_key_changed)
+        # Connect text change signals for status updates, debounced so a typing
+        # burst or a pasted token refreshes the status once
+        self._api_key_debounce = QTimer(self)
+        self._api_key_debounce.setSingleShot(True)
+        self._api_key_debounce.setInterval(200)
+        self._api_key_debounce.timeout.connect(self.on_api_key_changed)
+        self.openrouter_api_key.textChanged.connect(self._api_key_debounce.start)
+        self.openweathermap_api_key.textChanged.connect(self._api_key_debounce.start)
         
         api_layout.addWidget(api_keys_group)
         api_layout.addStretch()
         api_layout.setContentsMargins(0, 0, 0, 20)
-        
-        tabs.addTab(api_tab, "API Keys")
-        
+    
+    def _build_advanced_tab(self, page):
         # Advanced Settings Tab
-        advanced_tab = QWidget()
-        advanced_layout = QVBoxLayout(advanced_tab)
+        advanced_layout = QVBoxLayout(page)
         
         # (Removed) OpenRouter Inference API settings
 
@@ -223,6 +404,11 @@ class SettingsDialog(QDialog):
         self.ignore_status_pings.setToolTip("If enabled, alternates may be attempted even when status pings report paused/error.")
         other_advanced_layout.addRow("Ignore Status Pings:", self.ignore_status_pings)
 
+        self.speculative_fallback = QCheckBox()
+        self.speculative_fallback.setChecked(False)
+        self.speculative_fallback.setToolTip("Query several alternate models at once and use the first answer. Faster recovery, but each fallback sends up to 'Alternate Attempt Cap' API requests.")
+        other_advanced_layout.addRow("Race Alternates:", self.speculative_fallback)
+
         from PySide6.QtWidgets import QLineEdit as _QLineEditAlias
         self.alternate_priority = _QLineEditAlias()
         self.alternate_priority.setPlaceholderText("model_id1, model_id2, ...")
@@ -242,13 +428,10 @@ class SettingsDialog(QDialog):
         def _update_advanced_recovery_enabled(checked: bool):
             self.alt_attempt_cap.setEnabled(checked)
             self.ignore_status_pings.setEnabled(checked)
+            self.speculative_fallback.setEnabled(checked)
             self.alternate_priority.setEnabled(checked)
         self.auto_fallback.toggled.connect(_update_advanced_recovery_enabled)
-        # Initialize enabled state immediately on construct (before load)
-        try:
-            _update_advanced_recovery_enabled(self.auto_fallback.isChecked())
-        except Exception:
-            pass
+        # The initial enabled state is applied once by _load_tab_settings("advanced")
 
         # Persist advanced settings when toggles change and refresh main UI
         def _on_auto_fallback_toggled(v: bool):
@@ -281,91 +464,41 @@ class SettingsDialog(QDialog):
         
         advanced_layout.addWidget(other_advanced_group)
         advanced_layout.addStretch()
-        
-        tabs.addTab(advanced_tab, "Advanced")
-        
-        layout.addWidget(tabs)
-        
-        # Buttons
-        button_layout = QHBoxLayout()
-        
-        clear_data_btn = QPushButton("Delete Local Data")
-        clear_data_btn.clicked.connect(self.clear_local_memory)
-        clear_data_btn.setStyleSheet("background-color: #e53935; color: white; padding: 8px; border-radius: 8px;")
-        
-        save_btn = QPushButton("Save")
-        save_btn.clicked.connect(self.save_settings)
-        save_btn.setStyleSheet("background-color: #4CAF50; color: white; padding: 8px; border-radius: 8px;")
-        
-        cancel_btn = QPushButton("Cancel")
-        cancel_btn.clicked.connect(self.reject)
-        cancel_btn.setStyleSheet("background-color: #555; color: white; padding: 8px; border-radius: 8px;")
-        
-        reset_btn = QPushButton("Reset to Defaults")
-        reset_btn.clicked.connect(self.reset_to_defaults)
-        reset_btn.setStyleSheet("background-color: #f44336; color: white; padding: 8px; border-radius: 8px;")
-        
-        button_layout.addWidget(clear_data_btn)
-        button_layout.addWidget(reset_btn)
-        button_layout.addStretch()
-        button_layout.addWidget(save_btn)
-        button_layout.addWidget(cancel_btn)
-        
-        layout.addLayout(button_layout)
+    
     def load_api_keys(self):
         """Load API keys from .env file"""
-        # Match ai_api._load_env_from_dotenv: when frozen, use the
-        # executable directory so .env lives next to LunaAI.exe.
-        try:
-            import sys as _sys_alias
-            if getattr(_sys_alias, "frozen", False) and hasattr(_sys_alias, "executable"):
-                base_dir = os.path.dirname(_sys_alias.executable)
-            else:
-                base_dir = os.path.dirname(os.path.abspath(__file__))
-        except Exception:
-            base_dir = os.path.dirname(os.path.abspath(__file__))
-        env_path = os.path.join(base_dir, '.env')
-        
-        if os.path.exists(env_path):
-            with open(env_path, 'r') as f:
-                for line in f:
-                    line = line.strip()
-                    if line.startswith('OPENROUTER_API_KEY='):
-                        self.openrouter_api_key.setText(line.split('=', 1)[1])
-                    elif line.startswith('OPENWEATHERMAP_API_KEY='):
-                        self.openweathermap_api_key.setText(line.split('=', 1)[1])
+        values = _read_env_file(_env_file_path())
+        # Set both fields even when a key is missing, so a reopened dialog drops cancelled edits
+        self.openrouter_api_key.setText(values.get('OPENROUTER_API_KEY', ""))
+        self.openweathermap_api_key.setText(values.get('OPENWEATHERMAP_API_KEY', ""))
     
     def save_api_keys(self):
         """Save API keys to .env file or delete it if empty"""
         or_key = self.openrouter_api_key.text().strip()
         owm_key = self.openweathermap_api_key.text().strip()
-        # Use the same base directory logic as load_api_keys so the
-        # .env file is shared between dev and frozen builds.
-        try:
-            import sys as _sys_alias
-            if getattr(_sys_alias, "frozen", False) and hasattr(_sys_alias, "executable"):
-                base_dir = os.path.dirname(_sys_alias.executable)
-            else:
-                base_dir = os.path.dirname(os.path.abspath(__file__))
-        except Exception:
-            base_dir = os.path.dirname(os.path.abspath(__file__))
-        env_path = os.path.join(base_dir, '.env')
+        # Same path as load_api_keys so the .env file is shared between dev and frozen builds
+        env_path = _env_file_path()
+        
+        # Nothing to do when .env and this session's environment already hold these keys
+        wanted = {k: v for k, v in (('OPENROUTER_API_KEY', or_key), ('OPENWEATHERMAP_API_KEY', owm_key)) if v}
+        if (wanted and _read_env_file(env_path) == wanted
+                and all(os.environ.get(k) == v for k, v in wanted.items())):
+            self.update_api_status_display("✅ API keys saved successfully!")
+            return
         
         if or_key or owm_key:
             # Create .env file with keys
-            with open(env_path, 'w') as f:
-                f.write("# Luna AI API Keys Configuration\n")
-                f.write("# This file is automatically generated by the Settings dialog\n\n")
-                
+            _write_env_file(env_path, or_key, owm_key)
+            # Seed the parse cache with what was just written
+            try:
+                written = {}
                 if or_key:
-                    f.write("\n# OpenRouter API Configuration (optional - for premium models)\n")
-                    f.write("# Get your API key from: https://openrouter.ai/keys\n")
-                    f.write(f"OPENROUTER_API_KEY={or_key}\n")
-                    
+                    written['OPENROUTER_API_KEY'] = or_key
                 if owm_key:
-                    f.write("\n# OpenWeatherMap API Configuration (optional - for weather features)\n")
-                    f.write("# Get your API key from: https://openweathermap.org/api\n")
-                    f.write(f"OPENWEATHERMAP_API_KEY={owm_key}\n")
+                    written['OPENWEATHERMAP_API_KEY'] = owm_key
+                _ENV_CACHE[env_path] = (os.stat(env_path).st_mtime_ns, written)
+            except OSError:
+                _ENV_CACHE.pop(env_path, None)
             
             # Update environment variables for current session
             if or_key:
@@ -393,18 +526,12 @@ class SettingsDialog(QDialog):
                 pass
 
             self.update_api_status_display("✅ API keys saved successfully!")
-            # Update provider status display
-            if hasattr(self, 'parent') and hasattr(self.parent(), 'update_provider_status'):
-                self.parent().update_provider_status()
-            # Refresh model list to update availability
-            if hasattr(self, 'parent') and hasattr(self.parent(), 'refresh_model_list'):
-                self.parent().refresh_model_list()
-            elif hasattr(self, 'refresh_model_list'):
-                self.refresh_model_list()
+            self._refresh_parent_after_keys()
             
         elif os.path.exists(env_path):
             # Delete .env file if no keys
             os.remove(env_path)
+            _ENV_CACHE.pop(env_path, None)
             
             # Clear environment variables
             if 'OPENROUTER_API_KEY' in os.environ:
@@ -413,14 +540,18 @@ class SettingsDialog(QDialog):
                 del os.environ['OPENWEATHERMAP_API_KEY']
                 
             self.update_api_status_display("ℹ️ API keys cleared (no keys to save)")
-            # Update provider status display
-            if hasattr(self, 'parent') and hasattr(self.parent(), 'update_provider_status'):
-                self.parent().update_provider_status()
-            # Refresh model list to update availability
-            if hasattr(self, 'parent') and hasattr(self.parent(), 'refresh_model_list'):
-                self.parent().refresh_model_list()
-            elif hasattr(self, 'refresh_model_list'):
-                self.refresh_model_list()
+            self._refresh_parent_after_keys()
+    
+    def _refresh_parent_after_keys(self):
+        """Update provider status and model availability in the parent window"""
+        parent = self.parent()
+        if parent is not None and hasattr(parent, 'update_provider_status'):
+            parent.update_provider_status()
+        # Refresh model list to update availability
+        if parent is not None and hasattr(parent, 'refresh_model_list'):
+            parent.refresh_model_list()
+        elif hasattr(self, 'refresh_model_list'):
+            self.refresh_model_list()
     
     def on_api_key_changed(self):
         """Handle API key text changes"""
@@ -429,15 +560,20 @@ class SettingsDialog(QDialog):
         owm_key = self.openweathermap_api_key.text().strip()
         
         if or_key or owm_key:
-            self.api_status_label.setText("📝 Type your API keys and click 'Save' to apply changes")
+            self._set_api_status("📝 Type your API keys and click 'Save' to apply changes")
         else:
             self.update_api_status_display()
     
+    def _set_api_status(self, text):
+        # Skip the relayout/repaint when the status hasn't actually changed
+        if self.api_status_label.text() != text:
+            self.api_status_label.setText(text)
+    
     def update_api_status_display(self, message=None):
         """Update the API status display"""
         
         if message:
-            self.api_status_label.setText(message)
+            self._set_api_status(message)
             return
         
         or_key = self.openrouter_api_key.text().strip()
@@ -455,105 +591,143 @@ class SettingsDialog(QDialog):
         else:
             status_parts.append("⚠️ OpenWeatherMap token not set")
         
-        self.api_status_label.setText(" | ".join(status_parts))
+        self._set_api_status(" | ".join(status_parts))
     
     def update_creativity_label(self, value):
         """Update creativity value label when slider changes"""
-        creativity_value = value / 10.0
-        self.creativity_value_label.setText(f"{creativity_value:.1f}")
+        text = _CREATIVITY_LABELS[value]
+        if self.creativity_value_label.text() != text:
+            self.creativity_value_label.setText(text)
+    
+    def _backend_settings(self):
+        """The subset of settings mirrored into ai_api.update_advanced_settings"""
+        get = self.settings_manager.get
+        return {
+            'enable_search': get("enable_web_search"),
+            'enable_system_commands': get("enable_system_commands"),
+            'search_results_limit': get("search_results_limit"),
+            'conversation_memory': get("conversation_memory"),
+            'response_delay': get("response_delay"),
+            'current_model': get("current_ai_model", "local_engine"),
+            'remember_local_profile': get("save_chat_history"),
+        }
     
     def load_current_settings(self):
-        # Helper to coerce truthy/falsey strings to bool
-        def _to_bool(v, default=False):
-            if v is None:
-                return default
-            if isinstance(v, bool):
-                return v
+        snap = self.settings_manager.snapshot()
+        for name in ("general", "ui", "ai", "api", "advanced"):
+            if name in self._built_tabs:
+                self._load_tab_settings(name, snap)
+        # What the backend was last given, so Save only pushes what actually changed;
+        # taken again on every reopen since settings may have changed in between
+        self._initial_creativity = self.settings_manager.get("ai_creativity")
+        self._initial_backend = self._backend_settings()
+    
+    def _load_tab_settings(self, name, snap=None):
+        """Populate one built tab's widgets from the settings manager"""
+        if snap is None:
+            snap = self.settings_manager.snapshot()
+        # Setting values would otherwise fire toggled/textChanged handlers that write the
+        # same settings back and refresh the main window; derived state is applied below
+        blockers = [QSignalBlocker(getattr(self, attr)) for attr in self._TAB_WIDGETS.get(name, ())]
+        try:
+            self._fill_tab(name, snap)
+        finally:
+            for blocker in blockers:
+                blocker.unblock()
+    
+    def _fill_tab(self, name, snap):
+        if name == "general":
+            self.default_city.setText(snap.get("default_city"))
+        elif name == "ui":
+            self.font_size.setValue(snap.get("chat_font_size"))
+            
+            theme = snap.get("theme")
+            theme_index = self.theme.findText(theme)
+            if theme_index >= 0:
+                self.theme.setCurrentIndex(theme_index)
+            
+            self.auto_scroll.setChecked(snap.get("auto_scroll"))
+            self.save_history.setChecked(snap.get("save_chat_history"))
+        elif name == "ai":
+            # Load creativity setting
+            creativity = snap.get("ai_creativity")
+            self.creativity_slider.setValue(int(creativity * 10))
+            self.update_creativity_label(int(creativity * 10))
+        elif name == "api":
+            # Load API keys from .env file if it exists
+            self.load_api_keys()
+            self.update_api_status_display()
+        elif name == "advanced":
+            # Load advanced settings
+            self.search_results_limit.setValue(snap.get("search_results_limit"))
+            self.conversation_memory.setValue(snap.get("conversation_memory"))
+            self.response_delay.setValue(int(snap.get("response_delay") * 1000))
+            self.enable_web_search.setChecked(snap.get("enable_web_search"))
+            self.enable_system_commands.setChecked(snap.get("enable_system_commands"))
+            # (Removed) HF token and force-enable model settings
+            # Load resilience settings
+            self.auto_fallback.setChecked(_to_bool(snap.get("auto_fallback", True), True))
+            self.retry_attempts.setValue(int(snap.get("retry_attempts", 2)))
+            self.status_check_interval.setValue(int(snap.get("status_check_interval", 300)))
+            # Load advanced recovery settings
+            try:
+                self.alt_attempt_cap.setValue(int(snap.get("alt_attempt_cap", 3)))
+            except Exception:
+                self.alt_attempt_cap.setValue(3)
+            self.ignore_status_pings.setChecked(_to_bool(snap.get("ignore_status_pings", False), False))
+            self.speculative_fallback.setChecked(_to_bool(snap.get("speculative_fallback", False), False))
             try:
-                s = str(v).strip().lower()
-                if s in ("1", "true", "yes", "on"): return True
-                if s in ("0", "false", "no", "off"): return False
+                self.alternate_priority.setText(snap.get("alternate_priority", ""))
+            except Exception:
+                self.alternate_priority.setText("")
+            # Apply enabled state based on Auto Fallback
+            try:
+                enabled = self.auto_fallback.isChecked()
+                self.alt_attempt_cap.setEnabled(enabled)
+                self.ignore_status_pings.setEnabled(enabled)
+                self.speculative_fallback.setEnabled(enabled)
+                self.alternate_priority.setEnabled(enabled)
             except Exception:
                 pass
-            return bool(v)
-        self.default_city.setText(self.settings_manager.get("default_city"))
-        self.font_size.setValue(self.settings_manager.get("chat_font_size"))
-        
-        theme = self.settings_manager.get("theme")
-        theme_index = self.theme.findText(theme)
-        if theme_index >= 0:
-            self.theme.setCurrentIndex(theme_index)
-        
-        self.auto_scroll.setChecked(self.settings_manager.get("auto_scroll"))
-        self.save_history.setChecked(self.settings_manager.get("save_chat_history"))
-        
-        # Load creativity setting
-        creativity = self.settings_manager.get("ai_creativity")
-        self.creativity_slider.setValue(int(creativity * 10))
-        self.update_creativity_label(int(creativity * 10))
-        
-        # Load advanced settings
-        self.search_results_limit.setValue(self.settings_manager.get("search_results_limit"))
-        self.conversation_memory.setValue(self.settings_manager.get("conversation_memory"))
-        self.response_delay.setValue(int(self.settings_manager.get("response_delay") * 1000))
-        self.enable_web_search.setChecked(self.settings_manager.get("enable_web_search"))
-        self.enable_system_commands.setChecked(self.settings_manager.get("enable_system_commands"))
-        # (Removed) HF token and force-enable model settings
-        # Load resilience settings
-        self.auto_fallback.setChecked(_to_bool(self.settings_manager.get("auto_fallback", True), True))
-        self.retry_attempts.setValue(int(self.settings_manager.get("retry_attempts", 2)))
-        self.status_check_interval.setValue(int(self.settings_manager.get("status_check_interval", 300)))
-        # Load advanced recovery settings
-        try:
-            self.alt_attempt_cap.setValue(int(self.settings_manager.get("alt_attempt_cap", 3)))
-        except Exception:
-            self.alt_attempt_cap.setValue(3)
-        self.ignore_status_pings.setChecked(_to_bool(self.settings_manager.get("ignore_status_pings", False), False))
-        try:
-            self.alternate_priority.setText(self.settings_manager.get("alternate_priority", ""))
-        except Exception:
-            self.alternate_priority.setText("")
-        # Apply enabled state based on Auto Fallback
-        try:
-            enabled = self.auto_fallback.isChecked()
-            self.alt_attempt_cap.setEnabled(enabled)
-            self.ignore_status_pings.setEnabled(enabled)
-            self.alternate_priority.setEnabled(enabled)
-        except Exception:
-            pass
-        
-        # Load API keys from .env file if it exists
-        self.load_api_keys()
     
     def save_settings(self):
-        self.settings_manager.set("default_city", self.default_city.text())
-        self.settings_manager.set("chat_font_size", self.font_size.value())
-        self.settings_manager.set("theme", self.theme.currentText())
-        self.settings_manager.set("auto_scroll", self.auto_scroll.isChecked())
-        self.settings_manager.set("save_chat_history", self.save_history.isChecked())
-        
-        # Save creativity setting
-        creativity_value = self.creativity_slider.value() / 10.0
-        self.settings_manager.set("ai_creativity", creativity_value)
-        
-        # Save advanced settings
-        self.settings_manager.set("search_results_limit", self.search_results_limit.value())
-        self.settings_manager.set("conversation_memory", self.conversation_memory.value())
-        self.settings_manager.set("response_delay", self.response_delay.value() / 1000.0)
-        self.settings_manager.set("enable_web_search", self.enable_web_search.isChecked())
-        self.settings_manager.set("enable_system_commands", self.enable_system_commands.isChecked())
-        # (Removed) HF token persistence and application
-        # Save resilience settings
-        self.settings_manager.set("auto_fallback", self.auto_fallback.isChecked())
-        self.settings_manager.set("retry_attempts", self.retry_attempts.value())
-        self.settings_manager.set("status_check_interval", self.status_check_interval.value())
-        # Save advanced recovery settings
-        self.settings_manager.set("alt_attempt_cap", self.alt_attempt_cap.value())
-        self.settings_manager.set("ignore_status_pings", self.ignore_status_pings.isChecked())
-        self.settings_manager.set("alternate_priority", (self.alternate_priority.text() or "").strip())
-        
-        # Save API keys and manage .env file
-        self.save_api_keys()
+        # Only tabs that were opened have widgets; the rest keep their stored values
+        values = {"default_city": self.default_city.text()}
+        built = self._built_tabs
+        if "ui" in built:
+            values.update({
+                "chat_font_size": self.font_size.value(),
+                "theme": self.theme.currentText(),
+                "auto_scroll": self.auto_scroll.isChecked(),
+                "save_chat_history": self.save_history.isChecked(),
+            })
+        if "ai" in built:
+            # Creativity setting
+            values["ai_creativity"] = self.creativity_slider.value() / 10.0
+        if "advanced" in built:
+            values.update({
+                # Advanced settings
+                "search_results_limit": self.search_results_limit.value(),
+                "conversation_memory": self.conversation_memory.value(),
+                "response_delay": self.response_delay.value() / 1000.0,
+                "enable_web_search": self.enable_web_search.isChecked(),
+                "enable_system_commands": self.enable_system_commands.isChecked(),
+                # (Removed) HF token persistence and application
+                # Resilience settings
+                "auto_fallback": self.auto_fallback.isChecked(),
+                "retry_attempts": self.retry_attempts.value(),
+                "status_check_interval": self.status_check_interval.value(),
+                # Advanced recovery settings
+                "alt_attempt_cap": self.alt_attempt_cap.value(),
+                "ignore_status_pings": self.ignore_status_pings.isChecked(),
+                "speculative_fallback": self.speculative_fallback.isChecked(),
+                "alternate_priority": (self.alternate_priority.text() or "").strip(),
+            })
+        self.settings_manager.update(values)
+        
+        # Save API keys and manage .env file; an unopened tab means the keys weren't edited
+        if "api" in built:
+            self.save_api_keys()
         
         # Persist settings to disk so they survive restarts
         try:
@@ -564,50 +738,54 @@ class SettingsDialog(QDialog):
         # Apply updated settings immediately to AI backend so toggles take effect
         try:
             # Sync creativity to local conversation engine
-            ai_api.set_ai_creativity(creativity_value)
+            creativity = self.settings_manager.get("ai_creativity")
+            if creativity != self._initial_creativity:
+                ai_api.set_ai_creativity(creativity)
+                self._initial_creativity = creativity
             # Push advanced flags/limits so features enable/disable without restart
-            ai_api.update_advanced_settings({
-                'enable_search': self.enable_web_search.isChecked(),
-                'enable_system_commands': self.enable_system_commands.isChecked(),
-                'search_results_limit': self.search_results_limit.value(),
-                'conversation_memory': self.conversation_memory.value(),
-                'response_delay': self.response_delay.value() / 1000.0,
-                'current_model': self.settings_manager.get("current_ai_model", "local_engine"),
-                'remember_local_profile': self.save_history.isChecked(),
-            })
+            backend = self._backend_settings()
+            delta = {k: v for k, v in backend.items() if self._initial_backend.get(k) != v}
+            if delta:
+                ai_api.update_advanced_settings(delta)
+                self._initial_backend = backend
         except Exception:
             pass
 
         QMessageBox.information(self, "Settings Saved", "Settings have been saved successfully!\nAI model, creativity level, and advanced options updated.")
         # Proactively refresh main UI model enabling to reflect new settings
+        # Deferred to the event loop so the dialog closes before the refresh runs
         try:
-            parent = self.parent()
-            if parent is not None and hasattr(parent, 'update_model_status_ui'):
-                parent.update_model_status_ui()
-            else:
-                # Fallback: find main window among top-level widgets
-                try:
-                    for w in QApplication.topLevelWidgets():
-                        if hasattr(w, 'update_model_status_ui'):
-                            w.update_model_status_ui()
-                            break
-                except Exception:
-                    pass
+            main_window = self._main_window()
+            if main_window is not None:
+                QTimer.singleShot(0, main_window.update_model_status_ui)
         except Exception:
             pass
         self.accept()
     
+    def _main_window(self):
+        """The window exposing update_model_status_ui, or None"""
+        main_window = self._main_window_ref() if self._main_window_ref is not None else None
+        if main_window is None:
+            # Fallback: find main window among top-level widgets
+            try:
+                for w in QApplication.topLevelWidgets():
+                    if hasattr(w, 'update_model_status_ui'):
+                        self._main_window_ref = weakref.ref(w)
+                        return w
+            except Exception:
+                pass
+        return main_window
+    
     def reset_to_defaults(self):
         reply = QMessageBox.question(self, "Reset Settings", 
                                    "Are you sure you want to reset all settings to defaults?",
                                    QMessageBox.Yes | QMessageBox.No)
         if reply == QMessageBox.Yes:
-            self.settings_manager.settings = self.settings_manager.default_settings.copy()
-            self.settings_manager.save_settings()
+            self.settings_manager.reset_to_defaults()
             self.load_current_settings()
             # Also clear any locally stored conversation memory/profile
             try:
-                ai_api.conversation_engine.context_memory = []
+                ai_api.conversation_engine.context_memory.clear()
                 if hasattr(ai_api.conversation_engine, "user_profile"):
                     ai_api.conversation_engine.user_profile = {}
                 if hasattr(ai_api.conversation_engine, "clear_disk_data"):
@@ -625,7 +803,7 @@ class SettingsDialog(QDialog):
         if reply != QMessageBox.Yes:
             return
         try:
-            ai_api.conversation_engine.context_memory = []
+            ai_api.conversation_engine.context_memory.clear()
             if hasattr(ai_api.conversation_engine, "user_profile"):
                 ai_api.conversation_engine.user_profile = {}
             if hasattr(ai_api.conversation_engine, "clear_disk_data"):
@@ -636,31 +814,50 @@ class SettingsDialog(QDialog):
 
 # Enhanced Thread for API calls with model support
 class LunaThread(QThread):
-    response_ready = Signal(str)
+    """Runs one AI request and emits a ready-to-display payload:
+    {'text': str, 'is_search': bool}
+
+    Text streamed from the model is emitted piece by piece through chunk_ready first."""
+    response_ready = Signal(dict)
+    chunk_ready = Signal(str)
 
     def __init__(self, command, settings_manager):
         super().__init__()
         self.command = command
         self.settings_manager = settings_manager
 
+    @staticmethod
+    def _prepare(response):
+        """Strip engine/status lines and classify the reply, off the GUI thread"""
+        if response:
+            lines = [ln for ln in response.split("\n")
+                     if not ln.strip().startswith("[Using:")]
+            response = "\n".join(lines).strip()
+        # Search results carry a "Search results for" header plus markdown links or bold headers
+        is_search = ("Search results for" in response and
+                     ("[Link](" in response or "**" in response or "Link" in response))
+        return response, is_search
+
     def run(self):
+        start_time = time.time()
         try:
-            start_time = time.time()
             # Always use the model selected in settings for this response
             try:
                 active_model_id = self.settings_manager.get("current_ai_model", "local_engine")
             except Exception:
                 active_model_id = "local_engine"
 
-            response = ai_api.call_ai_api(self.command, model_id=active_model_id)
+            response = ai_api.call_ai_api(self.command, model_id=active_model_id,
+                                          on_chunk=self.chunk_ready.emit)
             response_time = time.time() - start_time
             
             # Update performance metrics
             self.settings_manager.update_performance_metrics(response_time)
             
-            self.response_ready.emit(response)
+            text, is_search = self._prepare(response)
         except Exception as e:
-            self.response_ready.emit(f"Error: {str(e)}")
+            text, is_search = f"Error: {str(e)}", False
+        self.response_ready.emit({"text": text, "is_search": is_search})
 
 # Worker thread to check OpenRouter model statuses without blocking the UI
 class ModelStatusWorker(QThread):
@@ -674,163 +871,282 @@ class ModelStatusWorker(QThread):
 
     def run(self):
         results = {}
-        for model_id in self.model_ids:
-            try:
-                res = ai_api.check_hf_model_status(model_id)
-                # Ensure keys exist
-                status = res.get('status', 'error')
-                error = res.get('error')
-                results[model_id] = {'status': status, 'error': error}
-            except Exception as e:
-                results[model_id] = {'status': 'error', 'error': str(e)}
+        if not self.model_ids:
+            self.results_ready.emit(results)
+            return
+        # Pings are network-bound, so run them side by side; ai_api still caps
+        # concurrent OpenRouter requests
+        with ThreadPoolExecutor(max_workers=min(8, len(self.model_ids))) as pool:
+            futures = {pool.submit(ai_api.check_openrouter_model_status, model_id): model_id
+                       for model_id in self.model_ids}
+            for future in as_completed(futures):
+                model_id = futures[future]
+                try:
+                    res = future.result()
+                    # Ensure keys exist
+                    status = res.get('status', 'error')
+                    error = res.get('error')
+                    results[model_id] = {'status': status, 'error': error}
+                except Exception as e:
+                    results[model_id] = {'status': 'error', 'error': str(e)}
         self.results_ready.emit(results)
 
+class _DownloadSignals(QObject):
+    progress = Signal(int, int, str)
+    finished_with_result = Signal(bool, str)
+
+class _DownloadTask(QRunnable):
+    """Downloads one local model on the shared download pool, reporting through signals"""
+    def __init__(self, manager, model_id):
+        super().__init__()
+        self.manager = manager
+        self.model_id = model_id
+        # Owned by the caller (GUI thread) so queued deliveries outlive the runnable
+        self.signals = _DownloadSignals()
+
+    def run(self):
+        def _cb(current, total, msg):
+            try:
+                self.signals.progress.emit(current, total, msg)
+            except Exception:
+                pass
+
+        try:
+            success = self.manager.download_model(self.model_id, progress_callback=_cb)
+        except Exception as e:
+            print(f"Error downloading {self.model_id}: {e}")
+            success = False
+        self.signals.finished_with_result.emit(success, self.model_id)
+
+_DOWNLOAD_POOL = None
+
+def _download_pool():
+    """Thread pool shared by all model downloads (threads are reused between downloads)"""
+    global _DOWNLOAD_POOL
+    if _DOWNLOAD_POOL is None:
+        _DOWNLOAD_POOL = QThreadPool()
+        _DOWNLOAD_POOL.setMaxThreadCount(2)
+    return _DOWNLOAD_POOL
+
+class _DeferredSave(QObject):
+    """Coalesces save requests into one call after a quiet period.
+
+    request() may be called from worker threads (ai_api clears model errors from
+    LunaThread); the signal is queued to the GUI thread, which owns the timer."""
+    requested = Signal()
+
+    def __init__(self, callback, delay_ms=500):
+        super().__init__()
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(delay_ms)
+        self._timer.timeout.connect(callback)
+        self.requested.connect(self._timer.start)
+
+    def request(self):
+        self.requested.emit()
+
+# Built once at import; SettingsManager only reads it and copies the top level when
+# it needs a mutable settings dict. available_models is shared, never modified in place.
+_DEFAULT_SETTINGS = {
+    "default_city": "",
+    "ai_creativity": 0.7,
+    "chat_font_size": 14,
+    "theme": "dark",
+    "auto_scroll": True,
+    "save_chat_history": True,
+    # Advanced settings
+    "response_delay": 0.1,
+    "search_results_limit": 3,
+    "conversation_memory": 10,
+    # Model settings
+    "current_ai_model": "local_engine",
+    "api_timeout": 30,
+    # Resilience settings (backend only; no UI controls yet)
+    "auto_fallback": True,
+    "retry_attempts": 2,
+    # Advanced recovery defaults
+    "alt_attempt_cap": 3,              # Max alternate OpenRouter models to try (0 disables alternates)
+    "ignore_status_pings": False,      # If true, attempt alternates regardless of status ping classification
+    "alternate_priority": "",         # Comma-separated model_id order to prefer when trying alternates
+    "speculative_fallback": False,     # Race alternates concurrently (costs up to alt_attempt_cap requests per fallback)
+    # Background status monitoring interval in seconds (default 5 minutes)
+    "status_check_interval": 300,
+    # (Removed) OpenRouter token/force-enable settings
+    "enable_web_search": True,
+    "enable_system_commands": True,
+    # Available models (as originally configured by the user)
+    "available_models": {
+        "local_engine": {
+            "name": "Conversation Engine",
+            "type": "local",
+            "description": "Fast local responses with advanced pattern matching and creativity controls",
+            "features": ["instant_response", "offline", "privacy", "creativity_control", "weather_integration", "web_search", "system_commands"],
+            "status": "active"
+        },
+        "local/mistral-7b-instruct": {
+            "name": "Mistral 7B",
+            "type": "local",
+            "description": "Local 7B parameter model with excellent performance, runs entirely on your hardware",
+            "features": ["conversation", "reasoning", "instruction_following", "code_generation", "offline", "privacy"],
+            "status": "available"
+        },
+        "local/llama-3.1-8b-instruct": {
+            "name": "Llama 3.1 8B",
+            "type": "local",
+            "description": "Latest local 8B model with strong reasoning capabilities, runs entirely on your hardware",
+            "features": ["reasoning", "conversation", "instruction_following", "knowledge_retrieval", "offline", "privacy"],
+            "status": "available"
+        },
+        "local/qwen-2.5-7b-instruct": {
+            "name": "Qwen 2.5 7B",
+            "type": "local",
+            "description": "Local 7B model with strong multilingual capabilities, runs entirely on your hardware",
+            "features": ["multilingual", "conversation", "reasoning", "instruction_following", "offline", "privacy"],
+            "status": "available"
+        },
+        "local/deepseek-coder-6.7b": {
+            "name": "DeepSeek Coder 6.7B",
+            "type": "local",
+            "description": "Local 6.7B model optimized for coding and programming tasks, runs entirely on your hardware",
+            "features": ["code_generation", "programming_assistance", "debugging", "offline", "privacy"],
+            "status": "available"
+        },
+        "deepseek/deepseek-r1-0528:free": {
+            "name": "DeepSeek R1",
+            "type": "openrouter",
+            "description": "DeepSeek's latest conversational model optimized for chat interactions and instruction following",
+            "features": ["conversation", "instruction_following", "reasoning", "multilingual"],
+            "status": "available"
+        },
+        "openai/gpt-oss-20b:free": {
+            "name": "OpenAI GPT-OSS 20B",
+            "type": "openrouter",
+            "description": "Open-source 20B parameter language model based on GPT architecture with strong general-purpose capabilities",
+            "features": ["conversation", "reasoning", "code_generation", "knowledge_retrieval", "multilingual"],
+            "status": "available"
+        },
+        "openai/gpt-oss-120b:free": {
+            "name": "OpenAI GPT-OSS 120B",
+            "type": "openrouter",
+            "description": "Larger GPT-OSS 120B parameter model for more demanding reasoning and generation tasks",
+            "features": ["conversation", "reasoning", "code_generation", "knowledge_retrieval", "multilingual"],
+            "status": "available"
+        }
+    }
+}
+
+def _format_timestamp(ts) -> str:
+    return datetime.fromtimestamp(ts).strftime('%Y-%m-%d %H:%M:%S')
+
+def _error_entry(error) -> dict:
+    """In-memory model error record; the display string is formatted once, when recorded"""
+    now = time.time()
+    return {'error': error, 'timestamp': now, 'timestamp_str': _format_timestamp(now)}
+
+@dataclass(slots=True)
+class PerfMetrics:
+    """Session performance counters shown in the Models dialog"""
+    total_responses: int = 0
+    avg_response_time: float = 0.05
+    last_response_time: float = 0.0
+    session_start: float = field(default_factory=time.time)
+    memory_usage: float = 0.0
+
 # Enhanced Settings management with OpenRouter models
 class SettingsManager:
     def __init__(self):
         self.settings_file = "luna_settings.json"
-        self.default_settings = {
-            "default_city": "",
-            "ai_creativity": 0.7,
-            "chat_font_size": 14,
-            "theme": "dark",
-            "auto_scroll": True,
-            "save_chat_history": True,
-            # Advanced settings
-            "response_delay": 0.1,
-            "search_results_limit": 3,
-            "conversation_memory": 10,
-            # Model settings
-            "current_ai_model": "local_engine",
-            "api_timeout": 30,
-            # Resilience settings (backend only; no UI controls yet)
-            "auto_fallback": True,
-            "retry_attempts": 2,
-            # Advanced recovery defaults
-            "alt_attempt_cap": 3,              # Max alternate OpenRouter models to try (0 disables alternates)
-            "ignore_status_pings": False,      # If true, attempt alternates regardless of status ping classification
-            "alternate_priority": "",         # Comma-separated model_id order to prefer when trying alternates
-            # Background status monitoring interval in seconds (default 5 minutes)
-            "status_check_interval": 300,
-            # (Removed) OpenRouter token/force-enable settings
-            "enable_web_search": True,
-            "enable_system_commands": True,
-            # Available models (as originally configured by the user)
-            "available_models": {
-                "local_engine": {
-                    "name": "Conversation Engine",
-                    "type": "local",
-                    "description": "Fast local responses with advanced pattern matching and creativity controls",
-                    "features": ["instant_response", "offline", "privacy", "creativity_control", "weather_integration", "web_search", "system_commands"],
-                    "status": "active"
-                },
-                "local/mistral-7b-instruct": {
-                    "name": "Mistral 7B",
-                    "type": "local",
-                    "description": "Local 7B parameter model with excellent performance, runs entirely on your hardware",
-                    "features": ["conversation", "reasoning", "instruction_following", "code_generation", "offline", "privacy"],
-                    "status": "available"
-                },
-                "local/llama-3.1-8b-instruct": {
-                    "name": "Llama 3.1 8B",
-                    "type": "local",
-                    "description": "Latest local 8B model with strong reasoning capabilities, runs entirely on your hardware",
-                    "features": ["reasoning", "conversation", "instruction_following", "knowledge_retrieval", "offline", "privacy"],
-                    "status": "available"
-                },
-                "local/qwen-2.5-7b-instruct": {
-                    "name": "Qwen 2.5 7B",
-                    "type": "local",
-                    "description": "Local 7B model with strong multilingual capabilities, runs entirely on your hardware",
-                    "features": ["multilingual", "conversation", "reasoning", "instruction_following", "offline", "privacy"],
-                    "status": "available"
-                },
-                "local/deepseek-coder-6.7b": {
-                    "name": "DeepSeek Coder 6.7B",
-                    "type": "local",
-                    "description": "Local 6.7B model optimized for coding and programming tasks, runs entirely on your hardware",
-                    "features": ["code_generation", "programming_assistance", "debugging", "offline", "privacy"],
-                    "status": "available"
-                },
-                "deepseek/deepseek-r1-0528:free": {
-                    "name": "DeepSeek R1",
-                    "type": "openrouter",
-                    "description": "DeepSeek's latest conversational model optimized for chat interactions and instruction following",
-                    "features": ["conversation", "instruction_following", "reasoning", "multilingual"],
-                    "status": "available"
-                },
-                "openai/gpt-oss-20b:free": {
-                    "name": "OpenAI GPT-OSS 20B",
-                    "type": "openrouter",
-                    "description": "Open-source 20B parameter language model based on GPT architecture with strong general-purpose capabilities",
-                    "features": ["conversation", "reasoning", "code_generation", "knowledge_retrieval", "multilingual"],
-                    "status": "available"
-                },
-                "openai/gpt-oss-120b:free": {
-                    "name": "OpenAI GPT-OSS 120B",
-                    "type": "openrouter",
-                    "description": "Larger GPT-OSS 120B parameter model for more demanding reasoning and generation tasks",
-                    "features": ["conversation", "reasoning", "code_generation", "knowledge_retrieval", "multilingual"],
-                    "status": "available"
-                }
-            }
-        }
+        self.default_settings = _DEFAULT_SETTINGS
         self.settings = self.load_settings()
-        # Ensure persistent error storage key exists
-        if 'model_errors' not in self.settings:
-            self.settings['model_errors'] = {}
+        # Ensure persistent error storage key exists; every later replacement of
+        # self.settings goes through reset_to_defaults, which keeps it
+        self.settings.setdefault('model_errors', {})
         # Initialize performance tracking
-        self.performance_metrics = {
-            "total_responses": 0,
-            "avg_response_time": 0.05,
-            "last_response_time": 0.0,
-            "session_start": time.time(),
-            "memory_usage": 0.0
-        }
-        self.model_errors = {}  # Track errors by model_id: {error: str, timestamp: float}
+        self.performance_metrics = PerfMetrics()
+        self._process = None
+        self._memory_sampled_at = float("-inf")
         self.model_status = {}  # Track status of each model: 'available', 'paused', 'error', 'checking'
+        # (current_ai_model, available_models dict, resolved info) from the last get_active_model
+        self._active_model_cache = None
+        # save_settings only marks the file dirty; bursts of changes are written once
+        self._save_pending = False
+        # ai_api records/clears model errors from worker threads while the GUI thread
+        # serializes; mutations that can resize settings dicts and the dump share this lock
+        self._settings_lock = threading.RLock()
+        self._deferred_save = _DeferredSave(self._flush_settings)
+
+    @property
+    def model_errors(self) -> dict:
+        """Errors by model_id: {error, timestamp, timestamp_str}.
+
+        This is settings['model_errors'] itself, so recording an error also stages it for
+        the next save."""
+        return self.settings['model_errors']
+    
+    def reset_to_defaults(self):
+        """Replace all settings with the defaults and write them"""
+        self.settings = self.default_settings.copy()
+        self.settings['model_errors'] = {}
+        self._active_model_cache = None
+        self.save_settings()
 
     def set_model_status(self, model_id: str, status: str, error=None):
         """Set the status for a model and record/clear error accordingly."""
         # Normalize
         status = (status or 'error').lower()
         self.model_status[model_id] = status
-        if status == 'available':
-            # Clear any recorded error
-            if model_id in self.model_errors:
-                del self.model_errors[model_id]
-            if 'model_errors' not in self.settings:
-                self.settings['model_errors'] = {}
-            if model_id in self.settings['model_errors']:
-                del self.settings['model_errors'][model_id]
-        else:
-            # Save/Update error
-            msg = error or ('Paused' if status == 'paused' else 'Unavailable')
-            self.model_errors[model_id] = {'error': msg, 'timestamp': time.time()}
-            if 'model_errors' not in self.settings:
-                self.settings['model_errors'] = {}
-            self.settings['model_errors'][model_id] = {'error': msg, 'timestamp': time.time()}
+        with self._settings_lock:
+            if status == 'available':
+                # Clear any recorded error
+                self.model_errors.pop(model_id, None)
+            else:
+                # Save/Update error
+                msg = error or ('Paused' if status == 'paused' else 'Unavailable')
+                self.model_errors[model_id] = _error_entry(msg)
     
     def load_settings(self):
         try:
             if os.path.exists(self.settings_file):
-                with open(self.settings_file, 'r') as f:
+                with open(self.settings_file, 'r', encoding='utf-8') as f:
                     loaded = json.load(f)
                     # Merge with defaults for any missing keys
-                    settings = self.default_settings.copy()
-                    settings.update(loaded)
+                    settings = {**self.default_settings, **loaded}
                     # Update available models to include new ones
-                    settings["available_models"] = self.default_settings["available_models"].copy()
+                    settings["available_models"] = self.default_settings["available_models"]
                     return settings
         except Exception:
             pass
         return self.default_settings.copy()
     
     def save_settings(self):
+        """Schedule a write of the settings file; changes within 500 ms share one write"""
+        self._save_pending = True
+        self._deferred_save.request()
+    
+    def _flush_settings(self):
+        if self._save_pending:
+            self.save_settings_now()
+    
+    def save_settings_now(self):
+        """Write the settings file immediately (used on shutdown) as compact JSON"""
+        self._save_pending = False
+        # Serialize first and write once through a temp file, so a failed dump or a crash
+        # mid-write never leaves a truncated luna_settings.json behind
         try:
-            with open(self.settings_file, 'w') as f:
-                json.dump(self.settings, f, indent=2)
+            # Copy under the lock so worker-thread error updates can't resize dicts mid-dump
+            with self._settings_lock:
+                snapshot = copy.deepcopy(self.settings)
+            data = json.dumps(snapshot, ensure_ascii=False, separators=(',', ':'))
+            tmp_path = self.settings_file + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.settings_file)
         except Exception as e:
+            # Keep the change pending so the next save request retries it
+            self._save_pending = True
             print(f"Error saving settings: {e}")
     
     def get(self, key, default=None):
@@ -839,23 +1155,35 @@ class SettingsManager:
         return default
     
     def set(self, key, value):
-        self.settings[key] = value
+        with self._settings_lock:
+            self.settings[key] = value
+        if key in ("current_ai_model", "available_models"):
+            self._active_model_cache = None
+    
+    def snapshot(self) -> dict:
+        """Shallow copy of the current settings for reading many keys at once"""
+        return dict(self.settings)
+    
+    def update(self, values: dict) -> list:
+        """Apply several settings at once, skipping unchanged ones; returns the keys that changed"""
+        changed = [key for key, value in values.items()
+                   if key not in self.settings or self.settings[key] != value]
+        with self._settings_lock:
+            for key in changed:
+                self.settings[key] = values[key]
+        if "current_ai_model" in changed or "available_models" in changed:
+            self._active_model_cache = None
+        return changed
         
     def set_model_error(self, model_id: str, error: str):
         """Record an error for a specific model"""
-        self.model_errors[model_id] = {
-            'error': error,
-            'timestamp': time.time()
-        }
+        with self._settings_lock:
+            self.model_errors[model_id] = _error_entry(error)
         # Update status based on error type
         if 'paused' in error.lower():
             self.model_status[model_id] = 'paused'
         else:
             self.model_status[model_id] = 'error'
-        self.settings['model_errors'][model_id] = {
-            'error': error,
-            'timestamp': time.time()
-        }
     
     def get_model_error(self, model_id: str):
         """Get the last error for a model, if any"""
@@ -871,12 +1199,12 @@ class SettingsManager:
         
     def clear_model_error(self, model_id: str):
         """Clear any recorded error for a model"""
-        if model_id in self.model_errors:
-            del self.model_errors[model_id]
+        with self._settings_lock:
+            self.model_errors.pop(model_id, None)
         if model_id in self.model_status:
             self.model_status[model_id] = 'available'
-        if model_id in self.settings['model_errors']:
-            del self.settings['model_errors'][model_id]
+        # A cached error from an earlier status ping would otherwise outlive this
+        ai_api.invalidate_model_status(model_id)
         self.save_settings()
     
     def get_active_model(self):
@@ -891,24 +1219,28 @@ class SettingsManager:
 
         current_model_id = self.settings.get("current_ai_model", "local_engine")
 
+        # Reuse the last resolution while neither the id nor the models map changed;
+        # the refresh timer calls this every second
+        cached = self._active_model_cache
+        if cached is not None and cached[0] == current_model_id and cached[1] is models:
+            return dict(cached[2])
+
         def _with_id(mid: str, info: dict):
             d = dict(info or {})
             d.setdefault("id", mid)
-            return d
+            self._active_model_cache = (self.settings.get("current_ai_model", "local_engine"), models, d)
+            return dict(d)
 
         # Direct hit
         if current_model_id in models:
             return _with_id(current_model_id, models[current_model_id])
 
         # Try to normalize and map friendly/alias IDs to known keys (similar to ai_api.set_current_model)
-        def _norm(s: str) -> str:
-            return "".join(ch for ch in str(s).lower() if ch.isalnum())
-
-        target = _norm(current_model_id)
+        target = _norm_model_key(current_model_id)
         candidates = []
         for mid, info in models.items():
-            norm_key = _norm(mid)
-            norm_name = _norm(info.get("name", mid))
+            norm_key = _norm_model_key(mid)
+            norm_name = _norm_model_key(info.get("name", mid))
             suffix = norm_key.split("/")[-1] if "/" in norm_key else norm_key
             if target == norm_key or target == norm_name or target.endswith(suffix):
                 candidates.append(mid)
@@ -929,20 +1261,28 @@ class SettingsManager:
     
     def update_performance_metrics(self, response_time):
         """Update performance tracking metrics"""
-        self.performance_metrics["total_responses"] += 1
-        self.performance_metrics["last_response_time"] = response_time
+        self.performance_metrics.total_responses += 1
+        self.performance_metrics.last_response_time = response_time
         
-        # Calculate running average
-        total = self.performance_metrics["total_responses"]
-        current_avg = self.performance_metrics["avg_response_time"]
-        self.performance_metrics["avg_response_time"] = (current_avg * (total - 1) + response_time) / total
+        # Calculate running average incrementally (avoids scaling the average back up by total)
+        total = self.performance_metrics.total_responses
+        current_avg = self.performance_metrics.avg_response_time
+        self.performance_metrics.avg_response_time = current_avg + (response_time - current_avg) / total
         
-        # Update memory usage
-        try:
-            process = psutil.Process()
-            self.performance_metrics["memory_usage"] = process.memory_percent()
-        except:
-            self.performance_metrics["memory_usage"] = 0.0
+        self.sample_memory_usage()
+    
+    def sample_memory_usage(self, max_age=5.0):
+        """Memory usage percent, re-read from the OS at most every max_age seconds"""
+        now = time.monotonic()
+        if now - self._memory_sampled_at >= max_age:
+            self._memory_sampled_at = now
+            try:
+                if self._process is None:
+                    self._process = psutil.Process()
+                self.performance_metrics.memory_usage = self._process.memory_percent()
+            except Exception:
+                self.performance_metrics.memory_usage = 0.0
+        return self.performance_metrics.memory_usage
 
 # Enhanced AI Models Management Dialog with model selection
 class ModelsDialog(QDialog):
@@ -955,10 +1295,10 @@ class ModelsDialog(QDialog):
         self.setup_ui()
         self.load_model_data()
         
-        # Setup refresh timer for real-time updates
-        self.refresh_timer = QTimer()
+        # Setup refresh timer for real-time updates; it only runs while the dialog is shown
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(2000)  # Update every two seconds
         self.refresh_timer.timeout.connect(self.update_performance_display)
-        self.refresh_timer.start(1000)  # Update every second
         
         # Live refresh when model statuses update in the main window
         try:
@@ -1034,16 +1374,8 @@ class ModelsDialog(QDialog):
         current_model_id = self.settings_manager.get("current_ai_model")
         
         for model_id, model_info in available_models.items():
-            # Create a completely independent copy of the model info
-            # Using json dumps/loads to ensure a deep copy of all nested structures
-            model_info_copy = json.loads(json.dumps({
-                'name': model_info.get('name', 'Unknown'),
-                'type': model_info.get('type', 'openrouter'),
-                'description': model_info.get('description', 'No description available'),
-                'features': model_info.get('features', []).copy(),
-                'status': model_info.get('status', 'available')
-            }))
-            model_card = self.create_model_card(model_id, model_info_copy, model_id == current_model_id)
+            # create_model_card only reads model_info, so the stored dict is passed as is
+            model_card = self.create_model_card(model_id, model_info, model_id == current_model_id)
             scroll_layout.addWidget(model_card)
         
         scroll_layout.addStretch()
@@ -1146,9 +1478,10 @@ class ModelsDialog(QDialog):
             layout.addWidget(features_label)
         
         # Last checked time
-        last_checked = self.settings_manager.model_errors.get(model_id, {}).get('timestamp')
+        error_entry = self.settings_manager.model_errors.get(model_id, {})
+        last_checked = error_entry.get('timestamp')
         if last_checked:
-            last_checked_str = datetime.fromtimestamp(last_checked).strftime('%Y-%m-%d %H:%M:%S')
+            last_checked_str = error_entry.get('timestamp_str') or _format_timestamp(last_checked)
             checked_label = QLabel(f"Last checked: {last_checked_str}")
             checked_label.setStyleSheet("font-size: 9px; color: #666;")
             layout.addWidget(checked_label)
@@ -1284,27 +1617,8 @@ class ModelsDialog(QDialog):
         progress_bar.setValue(0)
         download_btn.setEnabled(False)
 
-        class DownloadWorker(QThread):
-            progress = Signal(int, int, str)
-            finished_with_result = Signal(bool, str)
-
-            def __init__(self, manager, model_id):
-                super().__init__()
-                self.manager = manager
-                self.model_id = model_id
-
-            def run(self):
-                def _cb(current, total, msg):
-                    try:
-                        self.progress.emit(current, total, msg)
-                    except Exception:
-                        pass
-
-                success = self.manager.download_model(self.model_id, progress_callback=_cb)
-                self.finished_with_result.emit(success, self.model_id)
-
-        worker = DownloadWorker(self.local_model_manager, model_id)
-        self._download_worker = worker
+        task = _DownloadTask(self.local_model_manager, model_id)
+        worker = task.signals
 
         def _on_progress(current, total, msg):
             try:
@@ -1354,7 +1668,7 @@ class ModelsDialog(QDialog):
         try:
             worker.progress.connect(_on_progress)
             worker.finished_with_result.connect(_on_finished)
-            worker.start()
+            _download_pool().start(task)
         except Exception as e:
             progress_bar.setVisible(False)
             download_btn.setEnabled(True)
@@ -1767,10 +2081,12 @@ class ModelsDialog(QDialog):
         
     def update_performance_display(self):
         """Update real-time performance metrics"""
+        if not self.isVisible():
+            return
         metrics = self.settings_manager.performance_metrics
         
         # Update response time
-        avg_time = metrics["avg_response_time"]
+        avg_time = metrics.avg_response_time
         self.response_time_label.setText(f"{avg_time:.3f}s")
         if avg_time < 0.1:
             self.response_time_label.setStyleSheet("color: #4CAF50; font-weight: bold;")
@@ -1780,17 +2096,16 @@ class ModelsDialog(QDialog):
             self.response_time_label.setStyleSheet("color: #f44336; font-weight: bold;")
         
         # Update last response time
-        last_time = metrics["last_response_time"]
+        last_time = metrics.last_response_time
         self.last_response_label.setText(f"{last_time:.3f}s")
         
         # Update total responses
-        total = metrics["total_responses"]
+        total = metrics.total_responses
         self.total_responses_label.setText(str(total))
         
-        # Update memory usage
+        # Update memory usage (sampled by the settings manager, not on every tick)
         try:
-            process = psutil.Process()
-            memory_percent = process.memory_percent()
+            memory_percent = self.settings_manager.sample_memory_usage()
             self.memory_progress.setValue(int(memory_percent))
             self.memory_label.setText(f"{memory_percent:.1f}%")
             
@@ -1826,7 +2141,7 @@ class ModelsDialog(QDialog):
             pass
         
         # Update uptime
-        uptime_seconds = int(time.time() - metrics["session_start"])
+        uptime_seconds = int(time.time() - metrics.session_start)
         minutes = uptime_seconds // 60
         seconds = uptime_seconds % 60
         hours = minutes // 60
@@ -2007,6 +2322,15 @@ class ModelsDialog(QDialog):
         if hasattr(self, 'refresh_timer'):
             self.refresh_timer.stop()
         super().closeEvent(event)
+    
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.update_performance_display()
+        self.refresh_timer.start()
+    
+    def hideEvent(self, event):
+        self.refresh_timer.stop()
+        super().hideEvent(event)
 
 
 class ClickableTextEdit(QTextEdit):
@@ -2036,6 +2360,8 @@ class LunaMainWindow(QMainWindow):
         self._auto_switch_notified = False
         # Track background status worker state to avoid overlapping runs
         self._status_check_running = False
+        # True while a reply is still streaming into the typing animation
+        self.stream_open = False
         self.setWindowTitle("Luna AI")
         # Set Luna window/taskbar icon from assets if available
         try:
@@ -2338,20 +2664,6 @@ class LunaMainWindow(QMainWindow):
     def update_model_status_ui(self):
         """Update model label, dropdown entries, and any visible badges."""
         # Pre-read flags with robust coercion
-        def _to_bool(v, default=False):
-            if v is None:
-                return default
-            if isinstance(v, bool):
-                return v
-            try:
-                s = str(v).strip().lower()
-                if s in ("1", "true", "yes", "on"):
-                    return True
-                if s in ("0", "false", "no", "off"):
-                    return False
-            except Exception:
-                pass
-            return bool(v)
         try:
             ignore_pings = _to_bool(self.settings_manager.get('ignore_status_pings', False), False)
             auto_fb = _to_bool(self.settings_manager.get('auto_fallback', True), True)
@@ -3209,20 +3521,6 @@ class LunaMainWindow(QMainWindow):
             status = self.settings_manager.get_model_status(selected_model_id)
             force_enable = self.settings_manager.get('force_enable_hf_models', False)
             # Respect Ignore Status Pings + Auto Fallback to allow switching
-            def _to_bool(v, default=False):
-                if v is None:
-                    return default
-                if isinstance(v, bool):
-                    return v
-                try:
-                    s = str(v).strip().lower()
-                    if s in ("1", "true", "yes", "on"):
-                        return True
-                    if s in ("0", "false", "no", "off"):
-                        return False
-                except Exception:
-                    pass
-                return bool(v)
             ignore_pings = _to_bool(self.settings_manager.get('ignore_status_pings', False), False)
             auto_fb = _to_bool(self.settings_manager.get('auto_fallback', True), True)
 
@@ -3396,27 +3694,8 @@ class LunaMainWindow(QMainWindow):
         if hasattr(self, 'model_download_btn'):
             self.model_download_btn.setEnabled(False)
 
-        class MainDownloadWorker(QThread):
-            progress = Signal(int, int, str)
-            finished_with_result = Signal(bool, str)
-
-            def __init__(self, manager, model_id):
-                super().__init__()
-                self.manager = manager
-                self.model_id = model_id
-
-            def run(self):
-                def _cb(current, total, msg):
-                    try:
-                        self.progress.emit(current, total, msg)
-                    except Exception:
-                        pass
-
-                success = self.manager.download_model(self.model_id, progress_callback=_cb)
-                self.finished_with_result.emit(success, self.model_id)
-
-        worker = MainDownloadWorker(self.local_model_manager_main, model_id)
-        self._main_download_worker = worker
+        task = _DownloadTask(self.local_model_manager_main, model_id)
+        worker = task.signals
 
         def _ensure_download_timer():
             """Create a simple timer that animates the bar while downloading."""
@@ -3501,7 +3780,7 @@ class LunaMainWindow(QMainWindow):
         try:
             worker.progress.connect(_on_progress)
             worker.finished_with_result.connect(_on_finished)
-            worker.start()
+            _download_pool().start(task)
         except Exception as e:
             if hasattr(self, 'model_download_progress'):
                 self.model_download_progress.setVisible(False)
@@ -3858,6 +4137,8 @@ class LunaMainWindow(QMainWindow):
         # Start AI processing thread
         self.ai_thread = LunaThread(message, self.settings_manager)
         self.ai_thread.response_ready.connect(self.handle_ai_response_with_typing)
+        self.ai_thread.chunk_ready.connect(self.handle_ai_chunk)
+        self.stream_open = False
         self.ai_thread.start()
     
     def show_typing_indicator(self):
@@ -3902,25 +4183,47 @@ class LunaMainWindow(QMainWindow):
             updated_html = re.sub(pattern, replacement, current_html)
             self.chat_display.setHtml(updated_html)
     
-    def handle_ai_response_with_typing(self, response):
+    def handle_ai_chunk(self, chunk):
+        """Feed streamed model text into the typing animation as it arrives"""
+        if self.stream_open:
+            self.response_text += chunk
+            return
+        if hasattr(self, "openrouter_wait_label"):
+            self.openrouter_wait_label.setVisible(False)
+        if hasattr(self, 'typing_indicator_html'):
+            self.chat_display.setHtml(self.typing_indicator_html)
+            delattr(self, 'typing_indicator_html')
+        # Keeps the animation waiting at the end of the text until the full reply arrives
+        self.stream_open = True
+        self.start_typing_animation(chunk)
+
+    def handle_ai_response_with_typing(self, payload):
         """Handle AI response with character-by-character typing (no dots)"""
 
         # Hide any OpenRouter waiting indicator once a response (or error) arrives
         if hasattr(self, "openrouter_wait_label"):
             self.openrouter_wait_label.setVisible(False)
 
-        # Strip out engine/status lines so they never show in the chat bubbles
-        if response:
-            lines = [ln for ln in response.split("\n")
-                     if not ln.strip().startswith("[Using:")]
-            response = "\n".join(lines).strip()
-
-        # Check if response contains search results BEFORE stopping any animations
-        # Look for "Search results for" and either markdown links or bold headers
-        is_search_result = ("Search results for" in response and 
-                          ("[Link](" in response or 
-                           "**" in response or 
-                           "Link" in response))
+        # LunaThread already stripped the engine/status lines and classified the reply
+        response = payload["text"]
+        is_search_result = payload["is_search"]
+
+        if self.stream_open:
+            self.stream_open = False
+            streamed = self.response_text.strip()
+            if response.startswith(streamed) and hasattr(self, 'typing_animation_timer'):
+                # The animation is already typing this reply; let it finish the full text
+                lead = len(self.response_text) - len(self.response_text.lstrip())
+                self.response_text = response
+                self.char_index = min(max(self.char_index - lead, 0), len(response))
+                return
+            # Otherwise (e.g. an error after part of the reply) retype the final text
+            if hasattr(self, 'typing_animation_timer'):
+                self.typing_animation_timer.stop()
+            if hasattr(self, 'pre_typing_html'):
+                self.chat_display.setHtml(self.pre_typing_html)
+            self.start_typing_animation(response)
+            return
         
         if is_search_result:
             # For search results, display immediately with proper HTML conversion
@@ -4110,7 +4413,7 @@ class LunaMainWindow(QMainWindow):
         if self.char_index < len(self.response_text):
             # Get text typed so far
             typed_text = self.response_text[:self.char_index + 1]
-            cursor = "|" if self.char_index < len(self.response_text) - 1 else ""
+            cursor = "|" if self.char_index < len(self.response_text) - 1 or self.stream_open else ""
             display_text = typed_text + cursor
 
             if hasattr(self, 'pre_typing_html'):
@@ -4133,6 +4436,9 @@ class LunaMainWindow(QMainWindow):
                 delay = 35  # Faster for letters
                 
             self.typing_animation_timer.start(delay)
+        elif self.stream_open:
+            # Caught up with the stream: wait for more text
+            self.typing_animation_timer.start(50)
         else:
             # Typing complete
             self.typing_animation_timer.stop()
@@ -4492,7 +4798,12 @@ class LunaMainWindow(QMainWindow):
             old_interval_sec = int(self.settings_manager.get("status_check_interval", 300))
         except Exception:
             old_interval_sec = 300
-        dialog = SettingsDialog(self.settings_manager, self)
+        # Built once and reused; reopening only reloads the stored values into its widgets
+        dialog = getattr(self, '_settings_dialog', None)
+        if dialog is None:
+            dialog = self._settings_dialog = SettingsDialog(self.settings_manager, self)
+        else:
+            dialog.load_current_settings()
         if dialog.exec() == QDialog.Accepted:
             # Refresh UI with new settings
             self.apply_theme()
@@ -4562,6 +4873,8 @@ if __name__ == "__main__":
     # Create and show main window
     window = LunaMainWindow()
     window.show()
+    # Settings writes are deferred; make sure the last one lands before exiting
+    app.aboutToQuit.connect(window.settings_manager.save_settings_now)
     
     # Start the application
     sys.exit(app.exec())
\ No newline at end of file